@@ -1,11 +1,72 @@
-from fastapi import APIRouter
-from ..services.generator_service import GeneratorService
+import json
+import logging
+import math
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from ..services.executor import DeadlineExceededError, OverloadedError
+from ..services.generator import GeneratorService
+from ..services.inference import WorkerUnavailableError
 from .schemas import QueryRequest, QueryResponse
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 service = GeneratorService()
 
+
+def _unavailable(status_code: int, error: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+@router.get("/health")
+def health():
+    return service.health()
+
+
 @router.post("/generate", response_model=QueryResponse)
-def generate(request: QueryRequest):
-    result = service.generate(request.query)
-    return QueryResponse(response=result)
\ No newline at end of file
+async def generate(request: QueryRequest):
+    try:
+        result = await service.generate(request.query)
+    except OverloadedError as e:
+        raise _unavailable(429, e)
+    except (DeadlineExceededError, WorkerUnavailableError) as e:
+        raise _unavailable(503, e)
+
+    return QueryResponse(response=result)
+
+
+async def _sse_events(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        async for token in tokens:
+            # JSON keeps newlines inside a token from breaking the event framing.
+            yield f"data: {json.dumps(token)}\n\n"
+    except (DeadlineExceededError, OverloadedError, WorkerUnavailableError) as e:
+        # Headers are already sent, so report the timeout, the full batching
+        # queue or the lost worker in-band.
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+        return
+    except Exception:
+        # Any other failure would otherwise cut the stream off silently.
+        logger.exception("Streaming generation failed")
+        yield f"event: error\ndata: {json.dumps('Generation failed')}\n\n"
+        return
+    yield "event: end\ndata: {}\n\n"
+
+
+@router.post("/generate/stream")
+async def generate_stream(request: QueryRequest):
+    try:
+        tokens = service.generate_stream(request.query)
+    except OverloadedError as e:
+        raise _unavailable(429, e)
+
+    return StreamingResponse(
+        _sse_events(tokens),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,15 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .api.routes import router
+from fastapi.concurrency import run_in_threadpool
+from .api.routes import router, service
 
-app = FastAPI()
-app.include_router(router)
\ No newline at end of file
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uvicorn only reports startup complete once models are loaded.
+    await run_in_threadpool(service.warmup)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(router)
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator
+
+from cbt_assistant.llm.errors import OverloadedError
+
+_DONE = object()
+
+
+class DeadlineExceededError(Exception):
+    """
+    Raised when a request runs past its deadline.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__("Request deadline exceeded")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Runs blocking generation on a fixed pool of threads for async handlers.
+
+    At most `max_workers` requests run and `max_queue_size` more wait; further
+    requests are refused at once with OverloadedError instead of piling up.
+    Each request has a deadline: when it passes, or when the caller stops
+    listening, queued work is dropped and running generation is stopped at the
+    next piece of text.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue_size: int = 8,
+        timeout_seconds: float = 120.0,
+        retry_after_seconds: float = 5.0,
+    ):
+        """
+        :param max_workers: Number of requests running at the same time.
+        :param max_queue_size: Number of admitted requests waiting for a worker.
+        :param timeout_seconds: Deadline of each request, from admission.
+        :param retry_after_seconds: Back-off suggested to refused clients.
+        """
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="generate")
+        self._capacity = max_workers + max_queue_size
+        self._timeout = timeout_seconds
+        self._retry_after = retry_after_seconds
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of admitted requests that are running or queued.
+        """
+        return self._pending
+
+    def stream(self, make_iterator: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+        """
+        Admit a request and iterate its output asynchronously.
+
+        Admission and submission happen immediately, so callers can turn
+        OverloadedError into a response before starting to stream. Must be
+        called from the event loop.
+
+        :param make_iterator: Called on a worker thread to start generation.
+        :return: Async iterator over the generated pieces of text.
+        :raises OverloadedError: If the queue is full.
+        """
+        with self._lock:
+            if self._pending >= self._capacity:
+                raise OverloadedError(self._retry_after)
+            self._pending += 1
+
+        loop = asyncio.get_running_loop()
+        pieces: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def put(item):
+            if not cancelled.is_set():
+                loop.call_soon_threadsafe(pieces.put_nowait, item)
+
+        def produce():
+            if cancelled.is_set():
+                return
+
+            try:
+                iterator = make_iterator()
+                try:
+                    for piece in iterator:
+                        if cancelled.is_set():
+                            break
+                        put(piece)
+                finally:
+                    # Closing the generator stops model generation.
+                    close = getattr(iterator, "close", None)
+                    if close is not None:
+                        close()
+                put(_DONE)
+            except Exception as e:
+                put(e)
+
+        future = self._executor.submit(produce)
+        future.add_done_callback(lambda _: self._release())
+
+        return self._consume(pieces, cancelled, future, loop.time() + self._timeout)
+
+    async def run(self, make_iterator: Callable[[], Iterator[str]]) -> str:
+        """
+        Admit a request and return its whole output.
+
+        :raises OverloadedError: If the queue is full.
+        :raises DeadlineExceededError: If the deadline passes first.
+        """
+        return "".join([piece async for piece in self.stream(make_iterator)]).strip()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _consume(
+        self,
+        pieces: asyncio.Queue,
+        cancelled: threading.Event,
+        future: Future,
+        deadline: float,
+    ) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        pieces.get(), max(deadline - loop.time(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    raise DeadlineExceededError(self._retry_after)
+
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Drops the request if it is still queued; running generation
+            # stops at its next piece of text.
+            cancelled.set()
+            future.cancel()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
@@ -1,11 +1,54 @@
+import os
+from typing import AsyncIterator, Dict, Optional
+from cbt_assistant.configuration.utils import load_config
 from cbt_assistant.pipeline import Pipeline
-from cbt_assistant.configuration.templates import AppConfig
+from .executor import BoundedExecutor
+from .inference import WorkerPoolClient, worker_socket_paths
+
+CONFIG_PATH_ENV = "CBT_ASSISTANT_CONFIG"
+DEFAULT_CONFIG_PATH = "app_config.yaml"
 
 
 class GeneratorService:
-    def __init__(self):
-        config = AppConfig(llm_config=..., rag_config=None, semantic_filter_config=None)
-        self._pipeline = Pipeline(config)
+    def __init__(self, config_path: Optional[str] = None):
+        config = load_config(
+            config_path or os.environ.get(CONFIG_PATH_ENV, DEFAULT_CONFIG_PATH)
+        )
+        if config.serving.inference_workers > 0:
+            # Models live in the inference worker pool; this process only
+            # routes requests to it.
+            self._pipeline = WorkerPoolClient(
+                worker_socket_paths(config.serving),
+                health_check_interval=config.serving.health_check_interval_seconds,
+                retry_after_seconds=config.serving.retry_after_seconds,
+            )
+        else:
+            self._pipeline = Pipeline(config)
+        self._executor = BoundedExecutor(
+            max_workers=config.serving.max_workers,
+            max_queue_size=config.serving.max_queue_size,
+            timeout_seconds=config.serving.request_timeout_seconds,
+            retry_after_seconds=config.serving.retry_after_seconds,
+        )
+
+    def warmup(self):
+        """
+        Load models ahead of the first request. Worker pool models are loaded
+        by the inference workers themselves.
+        """
+        if isinstance(self._pipeline, Pipeline):
+            self._pipeline.warmup()
+
+    async def generate(self, query: str) -> str:
+        return await self._executor.run(lambda: self._pipeline.generate_stream(query))
+
+    def generate_stream(self, query: str) -> AsyncIterator[str]:
+        return self._executor.stream(lambda: self._pipeline.generate_stream(query))
+
+    def health(self) -> Dict[str, object]:
+        if isinstance(self._pipeline, WorkerPoolClient):
+            workers = self._pipeline.health()
+            status = "ok" if any(workers.values()) else "unavailable"
+            return {"status": status, "pending": self._executor.pending, "workers": workers}
 
-    def generate(self, query: str) -> str:
-        return self._pipeline.generate(query)
\ No newline at end of file
+        return {"status": "ok", "pending": self._executor.pending}
@@ -0,0 +1,308 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import struct
+import threading
+from multiprocessing import get_context
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from cbt_assistant.configuration.templates import ServingConfig
+from cbt_assistant.configuration.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+class WorkerUnavailableError(Exception):
+    """
+    Raised when no inference worker can take a request, or when the worker
+    serving it dies before the response is complete.
+    """
+
+    def __init__(self, retry_after: float, message: str = "No healthy inference worker"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def send_frame(stream: BinaryIO, message: Dict[str, Any]):
+    """
+    Write one length-prefixed JSON message.
+    """
+    payload = json.dumps(message).encode("utf-8")
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def recv_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Read one length-prefixed JSON message, or None at end of stream.
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+
+    (size,) = _HEADER.unpack(header)
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+
+    return json.loads(payload)
+
+
+def worker_socket_paths(config: ServingConfig) -> List[str]:
+    return [
+        os.path.join(config.socket_dir, f"worker-{i}.sock")
+        for i in range(config.inference_workers)
+    ]
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = recv_frame(self.rfile)
+        if request is None:
+            return
+
+        if request.get("op") == "health":
+            send_frame(self.wfile, {"status": "ok", "active": self.server.active})
+            return
+
+        with self.server.slots:
+            self.server.track(1)
+            try:
+                self._generate(request["query"])
+            finally:
+                self.server.track(-1)
+
+    def _generate(self, query: str):
+        pieces = self.server.pipeline.generate_stream(query)
+
+        try:
+            for piece in pieces:
+                send_frame(self.wfile, {"piece": piece})
+            send_frame(self.wfile, {"done": True})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; closing the generator stops generation.
+            pass
+        except Exception as e:
+            logger.exception("Generation failed")
+            try:
+                send_frame(self.wfile, {"error": str(e)})
+            except OSError:
+                pass
+        finally:
+            pieces.close()
+
+
+class _WorkerServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, pipeline, max_concurrency: int):
+        super().__init__(socket_path, _WorkerHandler)
+        self.pipeline = pipeline
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def track(self, delta: int):
+        with self._lock:
+            self.active += delta
+
+
+def run_worker(config_path: str, socket_path: str):
+    """
+    Load the pipeline once and serve it on a Unix socket.
+    """
+    # Imported here so the supervisor and HTTP workers never load models.
+    from cbt_assistant.pipeline import Pipeline
+
+    config = load_config(config_path)
+    pipeline = Pipeline(config)
+    # Load everything before the socket exists, so a worker only passes
+    # health checks once it can serve.
+    pipeline.warmup()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with _WorkerServer(socket_path, pipeline, config.serving.max_workers) as server:
+        logger.info(f"Inference worker serving on {socket_path}")
+        server.serve_forever()
+
+
+def serve_workers(config_path: str):
+    """
+    Start the configured number of inference workers and restart any that
+    exit, until SIGINT or SIGTERM.
+    """
+    config = load_config(config_path).serving
+    os.makedirs(config.socket_dir, exist_ok=True)
+    context = get_context("spawn")
+    processes = {}
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while not stopping.is_set():
+        for path in worker_socket_paths(config):
+            process = processes.get(path)
+            if process is None or not process.is_alive():
+                if process is not None:
+                    logger.warning(f"Worker {path} exited ({process.exitcode}), restarting")
+                process = context.Process(
+                    target=run_worker, args=(config_path, path), daemon=True
+                )
+                process.start()
+                processes[path] = process
+        stopping.wait(1.0)
+
+    for process in processes.values():
+        process.terminate()
+    for process in processes.values():
+        process.join()
+
+
+class WorkerPoolClient:
+    """
+    Routes generation requests to inference workers over Unix sockets.
+
+    Each request goes to the healthy worker with the fewest requests in flight
+    from this client. A background thread health-checks every worker, and a
+    worker that refuses a connection is skipped until it answers again.
+    """
+
+    def __init__(
+        self,
+        socket_paths: List[str],
+        health_check_interval: float = 5.0,
+        retry_after_seconds: float = 5.0,
+    ):
+        """
+        :param socket_paths: Unix sockets of the inference workers.
+        :param health_check_interval: Seconds between health checks.
+        :param retry_after_seconds: Back-off suggested when no worker is up.
+        """
+        self._paths = socket_paths
+        self._interval = health_check_interval
+        self._retry_after = retry_after_seconds
+        self._lock = threading.Lock()
+        self._in_flight = {path: 0 for path in socket_paths}
+        self._healthy = set(socket_paths)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._check_health, daemon=True)
+        self._thread.start()
+
+    def generate_stream(self, query: str) -> Iterator[str]:
+        """
+        Generate a response on a worker, yielding text as it arrives. Closing
+        the iterator closes the connection, which stops generation.
+
+        :raises WorkerUnavailableError: If no worker is healthy, or the worker
+            dies before the response is complete, possibly after some pieces
+            were yielded.
+        """
+        for _ in range(len(self._paths)):
+            path = self._pick()
+            try:
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.connect(path)
+            except OSError:
+                connection.close()
+                self._set_health(path, False)
+                self._finish(path)
+                continue
+
+            started = False
+            try:
+                stream = connection.makefile("rwb")
+                send_frame(stream, {"op": "generate", "query": query})
+                while True:
+                    message = recv_frame(stream)
+                    if message is None:
+                        raise ConnectionError(f"Worker {path} closed the connection")
+                    if "error" in message:
+                        raise RuntimeError(message["error"])
+                    if message.get("done"):
+                        return
+                    started = True
+                    yield message["piece"]
+            except OSError as e:
+                # The worker died mid-request. Skip it until it answers a
+                # health check again; the query is not replayed elsewhere.
+                logger.warning(f"Worker {path} failed during a request: {e}")
+                self._set_health(path, False)
+                raise WorkerUnavailableError(
+                    self._retry_after,
+                    "Inference worker failed mid-response"
+                    if started
+                    else "Inference worker failed before responding",
+                ) from e
+            finally:
+                connection.close()
+                self._finish(path)
+
+        raise WorkerUnavailableError(self._retry_after)
+
+    def health(self) -> Dict[str, bool]:
+        with self._lock:
+            return {path: path in self._healthy for path in self._paths}
+
+    def close(self):
+        self._closed.set()
+
+    def _pick(self) -> str:
+        with self._lock:
+            if not self._healthy:
+                raise WorkerUnavailableError(self._retry_after)
+            path = min(self._healthy, key=self._in_flight.__getitem__)
+            self._in_flight[path] += 1
+            return path
+
+    def _finish(self, path: str):
+        with self._lock:
+            self._in_flight[path] -= 1
+
+    def _set_health(self, path: str, healthy: bool):
+        with self._lock:
+            if healthy:
+                self._healthy.add(path)
+            else:
+                self._healthy.discard(path)
+
+    def _ping(self, path: str) -> bool:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(self._interval)
+                connection.connect(path)
+                stream = connection.makefile("rwb")
+                send_frame(stream, {"op": "health"})
+                reply = recv_frame(stream)
+        except OSError:
+            return False
+
+        return reply is not None and reply.get("status") == "ok"
+
+    def _check_health(self):
+        while not self._closed.wait(self._interval):
+            for path in self._paths:
+                self._set_health(path, self._ping(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the inference worker pool")
+    parser.add_argument("--config", type=str, default="app_config.yaml", help="Path to the configuration file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    serve_workers(args.config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class AvailableHuggingFaceModels(Enum):
+    PHI2 = "microsoft/phi-2"
+    PHI1_5 = "microsoft/phi-1_5"
+
+
+class SentenceTransformersEmbedderModels(str, Enum):
+    E5_SMALL = "intfloat/e5-small-v2"
+    E5_BASE = "intfloat/e5-base-v2"
@@ -1,8 +1,7 @@
 from pydantic import BaseModel, validator
 from typing import Optional
 from enum import Enum
-from ..llm.models import AvailableHuggingFaceModels
-from ..rag.embedder import SentenceTransformersEmbedderModels
+from .enums import AvailableHuggingFaceModels, SentenceTransformersEmbedderModels
 
 
 class Device(str, Enum):
@@ -10,29 +9,109 @@ class Device(str, Enum):
     CUDA = "cuda"
 
 
+class LoadMode(str, Enum):
+    FP32 = "fp32"
+    BF16 = "bf16"
+    INT8_DYNAMIC = "int8_dynamic"
+    NF4 = "nf4"
+
+
 class ModelConfig(BaseModel):
-    device: Device
+    device: Device = Device.CPU
     model_id: str = AvailableHuggingFaceModels.PHI2.value
+    load_mode: LoadMode = LoadMode.FP32
+    num_threads: Optional[int] = None
     system_prompt: str = ""
     max_tokens: int = 200
-    temperature: float = 1.0,
-    top_k: Optional[int] = None,
+    temperature: float = 1.0
+    top_k: Optional[int] = None
     top_p: Optional[float] = None
+    prefix_cache_size: int = 4
+    draft_model_id: Optional[str] = None
+    num_draft_tokens: int = 5
 
-    @validator("model_id")
+    @validator("model_id", "draft_model_id")
     def validate_model_id(cls, v):
+        if v is None:
+            return v
+
         allowed = [m.value for m in AvailableHuggingFaceModels]
 
         if v not in allowed:
             raise ValueError(f"Invalid model_id: {v}. Must be one of: {allowed}")
         return v
 
+    @validator("load_mode")
+    def validate_load_mode(cls, v, values):
+        device = values.get("device")
+
+        if v == LoadMode.NF4 and device != Device.CUDA:
+            raise ValueError("The nf4 load_mode needs bitsandbytes on a cuda device")
+        if v == LoadMode.INT8_DYNAMIC and device != Device.CPU:
+            raise ValueError("The int8_dynamic load_mode only runs on cpu")
+        return v
+
+    @validator("num_threads", "num_draft_tokens")
+    def validate_positive(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError(f"Model parameter must be positive, got {v}")
+        return v
+
+
+class IndexType(str, Enum):
+    FLAT = "flat"
+    IVF_FLAT = "ivf_flat"
+    HNSW = "hnsw"
+    IVF_PQ = "ivf_pq"
+
+
+class IndexMetric(str, Enum):
+    L2 = "l2"
+    INNER_PRODUCT = "ip"
+
+
+class VectorEncoding(str, Enum):
+    FLOAT32 = "float32"
+    FP16 = "fp16"
+    SQ8 = "sq8"
+    SQ4 = "sq4"
+
+
+class IndexConfig(BaseModel):
+    index_type: IndexType = IndexType.FLAT
+    metric: IndexMetric = IndexMetric.L2
+    encoding: VectorEncoding = VectorEncoding.FLOAT32
+    nlist: int = 1024
+    nprobe: int = 16
+    hnsw_m: int = 32
+    ef_search: int = 64
+    pq_m: int = 16
+    pq_nbits: int = 8
+
+    @validator("nlist", "nprobe", "hnsw_m", "ef_search", "pq_m", "pq_nbits")
+    def validate_positive(cls, v):
+        if v <= 0:
+            raise ValueError(f"Index parameter must be positive, got {v}")
+        return v
+
+
+class EmbedderBackend(str, Enum):
+    TORCH = "torch"
+    ONNX = "onnx"
+
 
 class RAGConfig(BaseModel):
     faiss_index_path: str
     document_store_path: str
     embed_model: str = SentenceTransformersEmbedderModels.E5_SMALL.value
+    embed_backend: EmbedderBackend = EmbedderBackend.TORCH
+    onnx_model_dir: Optional[str] = None
+    onnx_quantized: bool = True
     top_k: int = 5
+    index: IndexConfig = IndexConfig()
+    mmap_index: bool = False
+    embedding_cache_dir: Optional[str] = None
+    embedding_cache_size: int = 1_000_000
 
     @validator("embed_model")
     def validate_embed_model(cls, v):
@@ -42,13 +121,52 @@ class RAGConfig(BaseModel):
             raise ValueError(f"Invalid embed_model: {v}. Must be one of: {allowed}")
         return v
 
+    @validator("onnx_model_dir", always=True)
+    def validate_onnx_model_dir(cls, v, values):
+        if values.get("embed_backend") == EmbedderBackend.ONNX and not v:
+            raise ValueError("onnx_model_dir is required for the onnx embed_backend")
+        return v
+
 
 class SemanticFilterConfig(BaseModel):
     threshold: float = 0.45
     topics_path: str = "data/cbt_topics.txt"
+    cascade: bool = False
+    decision_cache_size: int = 4096
+
+
+class EmbeddingBatchingConfig(BaseModel):
+    max_batch_size: int = 32
+    max_wait_ms: float = 5.0
+
+
+class GenerationBatchingConfig(BaseModel):
+    max_batch_size: int = 8
+    max_queue_size: int = 0
+
+
+class ResponseCacheConfig(BaseModel):
+    max_entries: int = 1024
+    max_distance: float = 0.02
+    ttl_seconds: Optional[float] = 3600
+
+
+class ServingConfig(BaseModel):
+    max_workers: int = 2
+    max_queue_size: int = 8
+    request_timeout_seconds: float = 120.0
+    retry_after_seconds: float = 5.0
+    inference_workers: int = 0
+    socket_dir: str = "/tmp/cbt_assistant"
+    health_check_interval_seconds: float = 5.0
 
 
 class AppConfig(BaseModel):
     model: ModelConfig = ModelConfig()
     rag: Optional[RAGConfig] = None
     semantic_filter: Optional[SemanticFilterConfig] = None
+    query_embedding_cache_size: int = 1024
+    embedding_batching: Optional[EmbeddingBatchingConfig] = None
+    generation_batching: Optional[GenerationBatchingConfig] = None
+    response_cache: Optional[ResponseCacheConfig] = None
+    serving: ServingConfig = ServingConfig()
@@ -0,0 +1,186 @@
+from bisect import bisect_right
+from enum import Enum
+from typing import Iterable, Iterator, List, Tuple
+from pydantic import BaseModel
+from .tokenizer import TokenizerWrapper
+
+
+class ChunkBoundary(str, Enum):
+    TOKEN = "token"
+    SENTENCE = "sentence"
+    PARAGRAPH = "paragraph"
+
+
+class Chunk(BaseModel):
+    text: str
+    tokens: int
+    page: int
+    end_page: int
+
+
+SENTENCE_ENDINGS = (b".", b"!", b"?", b'."', b'?"', b'!"')
+
+
+class TokenChunker:
+    """
+    Splits page text into overlapping token windows.
+
+    Each page is tokenized once; windows are sliced by token offsets and
+    decoded, so token counts come from the offsets instead of re-encoding.
+    Window ends can be pulled back to the last sentence or paragraph break,
+    and windows can continue across page breaks.
+    """
+
+    def __init__(
+        self,
+        tokenizer: TokenizerWrapper,
+        chunk_size: int = 200,
+        overlap: int = 40,
+        boundary: ChunkBoundary = ChunkBoundary.TOKEN,
+        min_tokens: int = 10,
+    ):
+        """
+        :param tokenizer: Tokenizer used for encoding and decoding.
+        :param chunk_size: Maximum number of tokens per chunk.
+        :param overlap: Number of tokens shared by consecutive chunks.
+        :param boundary: Where chunks may end.
+        :param min_tokens: Chunks with this many tokens or fewer are dropped.
+        """
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+
+        self._tokenizer = tokenizer
+        self._chunk_size = chunk_size
+        self._overlap = overlap
+        self._boundary = boundary
+        self._min_tokens = min_tokens
+
+    def chunk_text(self, text: str, page: int = 1) -> List[Chunk]:
+        """
+        Split a single text into chunks.
+        """
+        return list(self.chunk_pages([(page, text)]))
+
+    def chunk_pages(
+        self, pages: Iterable[Tuple[int, str]], across_pages: bool = False
+    ) -> Iterator[Chunk]:
+        """
+        Split pages into chunks lazily.
+
+        :param pages: (page number, text) pairs in page order.
+        :param across_pages: Let a chunk continue onto the following page
+            instead of ending at every page break.
+        :return: Iterator over chunks in document order.
+        """
+        tokens: List[int] = []
+        # Offsets in `tokens` where each page starts, and the page numbers.
+        page_starts: List[int] = []
+        page_numbers: List[int] = []
+
+        for page, text in pages:
+            if not across_pages:
+                tokens, page_starts, page_numbers = [], [], []
+
+            if page_numbers:
+                # Keep words on either side of a page break apart.
+                text = "\n" + text
+
+            page_starts.append(len(tokens))
+            page_numbers.append(page)
+            tokens.extend(self._tokenizer.encode(text))
+
+            start = yield from self._emit(
+                tokens, page_starts, page_numbers, final=not across_pages
+            )
+
+            if across_pages:
+                # Keep only the tokens still needed by the next window.
+                keep = bisect_right(page_starts, start) - 1
+                tokens = tokens[start:]
+                page_numbers = page_numbers[keep:]
+                page_starts = [max(s - start, 0) for s in page_starts[keep:]]
+
+        if across_pages and tokens:
+            yield from self._emit(tokens, page_starts, page_numbers, final=True)
+
+    def _emit(
+        self,
+        tokens: List[int],
+        page_starts: List[int],
+        page_numbers: List[int],
+        final: bool,
+    ):
+        """
+        Yield the windows of `tokens`. Unless `final`, stop before a window
+        that could still grow with tokens from the next page.
+
+        :return: Offset of the first token not yet covered by a finished window.
+        """
+        start = 0
+
+        while start < len(tokens):
+            if not final and len(tokens) - start < self._chunk_size:
+                return start
+
+            end = self._window_end(tokens, start)
+            text = self._tokenizer.decode(tokens[start:end]).strip()
+
+            if end - start > self._min_tokens and text:
+                yield Chunk(
+                    text=text,
+                    tokens=end - start,
+                    page=page_numbers[bisect_right(page_starts, start) - 1],
+                    end_page=page_numbers[bisect_right(page_starts, end - 1) - 1],
+                )
+
+            if end >= len(tokens):
+                return len(tokens)
+
+            start = self._next_start(tokens, start, end)
+
+        return start
+
+    def _window_end(self, tokens: List[int], start: int) -> int:
+        end = min(start + self._chunk_size, len(tokens))
+
+        if self._boundary == ChunkBoundary.TOKEN or end == len(tokens):
+            return end
+
+        # Pull the end back to the last break, keeping chunks above min_tokens.
+        for i in range(end, start + self._min_tokens + 1, -1):
+            if self._is_break(tokens, i):
+                return i
+
+        return end
+
+    def _next_start(self, tokens: List[int], start: int, end: int) -> int:
+        next_start = max(end - self._overlap, start + 1)
+
+        if self._boundary == ChunkBoundary.TOKEN:
+            return next_start
+
+        # Start the overlap at a break when one falls inside it.
+        for i in range(next_start, end):
+            if self._is_break(tokens, i):
+                return i
+
+        return next_start
+
+    def _is_break(self, tokens: List[int], i: int) -> bool:
+        """
+        Check whether a chunk may end right before tokens[i].
+        """
+        previous = self._tokenizer.decode_token_bytes(tokens[i - 1])
+
+        if self._boundary == ChunkBoundary.PARAGRAPH:
+            return b"\n\n" in previous or (
+                previous.endswith(b"\n")
+                and self._tokenizer.decode_token_bytes(tokens[i]).startswith(b"\n")
+            )
+
+        if previous.rstrip().endswith(SENTENCE_ENDINGS):
+            return previous[-1:].isspace() or self._tokenizer.decode_token_bytes(
+                tokens[i]
+            )[:1].isspace()
+
+        return False
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class FileRecord(BaseModel):
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+    first_id: int
+    end_id: int
+
+    def doc_ids(self) -> List[int]:
+        """
+        Ids of the documents produced by this file.
+        """
+        return list(range(self.first_id, self.end_id))
+
+
+class ManifestDiff(BaseModel):
+    new: List[str] = []
+    changed: List[str] = []
+    deleted: List[str] = []
+    unchanged: List[str] = []
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Record of the files ingested into a vector store and the contiguous range
+    of document ids each one produced.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path to the manifest JSON file.
+        """
+        self._path = path
+        self._records: Dict[str, FileRecord] = {}
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            self._records = {
+                record["path"]: FileRecord(**record) for record in data["files"]
+            }
+
+    @staticmethod
+    def path_for(index_path: str) -> str:
+        """
+        Default manifest location next to a FAISS index file.
+        """
+        return f"{index_path}.manifest.json"
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        return self._records.get(os.path.abspath(path))
+
+    def is_unchanged(self, path: str) -> bool:
+        """
+        Whether `path` was ingested and has not changed since.
+        """
+        path = os.path.abspath(path)
+        record = self._records.get(path)
+
+        return record is not None and self._matches(path, record)
+
+    def diff(self, paths: List[str], folder: str) -> ManifestDiff:
+        """
+        Compare files on disk with the manifest.
+
+        Size and mtime are checked first; the content hash is only computed
+        when they differ, so unchanged files cost one stat() call.
+
+        :param paths: Files currently present in the ingested folder.
+        :param folder: The ingested folder. Only recorded files under it are
+            reported as deleted.
+        :return: Files to ingest, re-ingest, remove or skip.
+        """
+        result = ManifestDiff()
+        present = {os.path.abspath(path) for path in paths}
+        root = os.path.join(os.path.abspath(folder), "")
+
+        for path in sorted(present):
+            record = self._records.get(path)
+
+            if record is None:
+                result.new.append(path)
+            elif self._matches(path, record):
+                result.unchanged.append(path)
+            else:
+                result.changed.append(path)
+
+        result.deleted = sorted(
+            path
+            for path in self._records
+            if path.startswith(root) and path not in present
+        )
+
+        return result
+
+    def record(self, path: str, first_id: int, end_id: int):
+        """
+        Store the document id range produced by ingesting `path`.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        self._records[path] = FileRecord(
+            path=path,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            sha256=file_sha256(path),
+            first_id=first_id,
+            end_id=end_id,
+        )
+
+    def remove(self, path: str) -> Optional[FileRecord]:
+        return self._records.pop(os.path.abspath(path), None)
+
+    @staticmethod
+    def _matches(path: str, record: FileRecord) -> bool:
+        stat = os.stat(path)
+
+        if stat.st_size != record.size:
+            return False
+        if stat.st_mtime == record.mtime:
+            return True
+        if file_sha256(path) == record.sha256:
+            record.mtime = stat.st_mtime
+            return True
+
+        return False
+
+    def save(self):
+        """
+        Write the manifest atomically.
+        """
+        dir_path = os.path.dirname(self._path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"files": [r.model_dump() for r in self._records.values()]}, f, indent=2
+            )
+        os.replace(tmp_path, self._path)
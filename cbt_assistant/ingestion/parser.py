@@ -1,78 +1,195 @@
 from abc import ABC, abstractmethod
+from collections import deque
+import math
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import chain, repeat
 import fitz
-from typing import List
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 from ..rag.document_store import Document, MetaField
+from .chunker import Chunk, ChunkBoundary, TokenChunker
 from .tokenizer import TokenizerWrapper
 
 
 class BaseParser(ABC):
     @abstractmethod
-    def parse(self, path: str, source: str = "") -> List[Document]:
+    def parse(self, path: str, source: str = "", first_id: int = 0) -> List[Document]:
         """
         Parse a file and return a list of Documents.
 
         :param path: Path to the file
         :param source: Optional string identifying the origin
+        :param first_id: Id of the first Document; the rest are numbered on
         :return: List of Document objects
         """
         pass
 
 
+# Chunkers cached per worker process, keyed by their settings.
+_worker_chunkers: Dict[tuple, TokenChunker] = {}
+
+# Page ranges handed out per worker, for load balancing across uneven pages.
+RANGES_PER_WORKER = 4
+
+
+def _iter_pages(doc, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    for i in range(start, doc.page_count if stop is None else stop):
+        text = doc.load_page(i).get_text().strip()
+        if text:
+            yield i + 1, text
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    with fitz.open(path) as doc:
+        return list(_iter_pages(doc, start, stop))
+
+
+def _bounded_map(
+    pool: Executor, fn: Callable, args: Iterable[tuple], window: int
+) -> Iterator:
+    """
+    Like pool.map(), but with at most `window` calls submitted and not yet
+    consumed, so results of far-ahead calls are not buffered in memory.
+    """
+    pending: Deque[Future] = deque()
+
+    for call_args in args:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, *call_args))
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _chunk_page_range(path: str, start: int, stop: int, settings: tuple) -> List[Chunk]:
+    chunker = _worker_chunkers.get(settings)
+
+    if chunker is None:
+        encoding, chunk_size, overlap, boundary = settings
+        chunker = TokenChunker(
+            TokenizerWrapper(encoding),
+            chunk_size=chunk_size,
+            overlap=overlap,
+            boundary=boundary,
+        )
+        _worker_chunkers[settings] = chunker
+
+    return list(chunker.chunk_pages(_extract_page_range(path, start, stop)))
+
+
 class PDFParser(BaseParser):
     """
     PDF parser that extracts text page-by-page and splits into token-aware chunks.
     """
 
-    def __init__(self, chunk_size: int = 200, overlap: int = 40, encoding: str = "cl100k_base"):
-        self._chunk_size = chunk_size
-        self._overlap = overlap
+    def __init__(
+        self,
+        chunk_size: int = 200,
+        overlap: int = 40,
+        encoding: str = "cl100k_base",
+        boundary: ChunkBoundary = ChunkBoundary.TOKEN,
+        across_pages: bool = False,
+        workers: int = 1,
+        min_pages_per_worker: int = 32,
+    ):
+        """
+        :param chunk_size: Maximum number of tokens per chunk.
+        :param overlap: Number of tokens shared by consecutive chunks.
+        :param encoding: tiktoken encoding used for chunking.
+        :param boundary: Align chunk ends to tokens, sentences or paragraphs.
+        :param across_pages: Let chunks continue across page breaks.
+        :param workers: Processes used to extract the pages of one document.
+        :param min_pages_per_worker: Documents with fewer pages per worker are
+            parsed in the calling process.
+        """
         self._tokenizer = TokenizerWrapper(encoding)
+        self._chunker = TokenChunker(
+            self._tokenizer, chunk_size=chunk_size, overlap=overlap, boundary=boundary
+        )
+        self._settings = (encoding, chunk_size, overlap, boundary)
+        self._across_pages = across_pages
+        self._workers = workers
+        self._min_pages_per_worker = min_pages_per_worker
+
+    def parse(self, path: str, source: str = "", first_id: int = 0) -> List[Document]:
+        return list(self.iter_parse(path, source, first_id))
+
+    def iter_parse(
+        self, path: str, source: str = "", first_id: int = 0
+    ) -> Iterator[Document]:
+        """
+        Lazily parse a PDF, reading one page at a time.
 
-    def parse(self, path: str, source: str = "") -> List[Document]:
-        doc = fitz.open(path)
-        documents = []
-        doc_id = 0
-
-        for i, page in enumerate(doc):
-            full_text = page.get_text().strip()
-            if not full_text:
-                continue
-
-            chunks = self._split_into_token_chunks(full_text)
-
-            for j, chunk in enumerate(chunks):
-                token_count = self._tokenizer.count_tokens(chunk)
-
-                documents.append(
-                    Document(
-                        id=doc_id,
-                        text=chunk,
-                        meta={
-                            MetaField.SOURCE: source or path,
-                            MetaField.PAGE: i + 1,
-                            MetaField.CHUNK: j + 1,
-                            MetaField.TYPE: "pdf",
-                            MetaField.TOKENS: token_count,
-                        }
-                    )
-                )
-                doc_id += 1
-
-        return documents
+        Large documents are split into page ranges that worker processes open
+        and extract independently; results are merged back in page order.
 
-    def _split_into_token_chunks(self, text: str) -> List[str]:
-        tokens = self._tokenizer.encode(text)
-        chunks = []
+        :param path: Path to the file
+        :param source: Optional string identifying the origin
+        :param first_id: Id of the first Document; the rest are numbered on
+        :return: Iterator over Document chunks in page order
+        """
+        with fitz.open(path) as doc:
+            page_count = doc.page_count
+
+            if self._workers > 1 and page_count >= 2 * self._min_pages_per_worker:
+                chunks = self._iter_parallel_chunks(path, page_count)
+            else:
+                chunks = self._chunker.chunk_pages(
+                    _iter_pages(doc), across_pages=self._across_pages
+                )
 
-        start = 0
-        while start < len(tokens):
-            end = start + self._chunk_size
-            chunk_tokens = tokens[start:end]
-            chunk_text = self._tokenizer.decode(chunk_tokens).strip()
+            yield from self._to_documents(chunks, source or path, first_id)
 
-            if self._tokenizer.count_tokens(chunk_text) > 10:
-                chunks.append(chunk_text)
+    def _iter_parallel_chunks(self, path: str, page_count: int) -> Iterator[Chunk]:
+        workers = min(self._workers, page_count // self._min_pages_per_worker)
+        size = math.ceil(page_count / (workers * RANGES_PER_WORKER))
+        starts = list(range(0, page_count, size))
+        stops = [min(start + size, page_count) for start in starts]
 
-            start += self._chunk_size - self._overlap
+        # Keep every worker busy with one range queued behind it.
+        window = 2 * workers
 
-        return chunks
\ No newline at end of file
+        with ProcessPoolExecutor(workers) as pool:
+            if self._across_pages:
+                # Chunks may span range borders, so only extraction is parallel.
+                pages = _bounded_map(
+                    pool, _extract_page_range, zip(repeat(path), starts, stops), window
+                )
+                yield from self._chunker.chunk_pages(
+                    chain.from_iterable(pages), across_pages=True
+                )
+            else:
+                ranges = _bounded_map(
+                    pool,
+                    _chunk_page_range,
+                    zip(repeat(path), starts, stops, repeat(self._settings)),
+                    window,
+                )
+                for chunks in ranges:
+                    yield from chunks
+
+    @staticmethod
+    def _to_documents(
+        chunks: Iterator[Chunk], source: str, first_id: int = 0
+    ) -> Iterator[Document]:
+        doc_id = first_id
+        page = None
+        chunk_no = 0
+
+        for chunk in chunks:
+            chunk_no = chunk_no + 1 if chunk.page == page else 1
+            page = chunk.page
+
+            yield Document(
+                id=doc_id,
+                text=chunk.text,
+                meta={
+                    MetaField.SOURCE: source,
+                    MetaField.PAGE: chunk.page,
+                    MetaField.END_PAGE: chunk.end_page,
+                    MetaField.CHUNK: chunk_no,
+                    MetaField.TYPE: "pdf",
+                    MetaField.TOKENS: chunk.tokens,
+                }
+            )
+            doc_id += 1
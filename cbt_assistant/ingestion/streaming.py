@@ -0,0 +1,123 @@
+import queue
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+from ..rag.document_store import Document
+from ..rag.embedder import BaseEmbedder
+from ..rag.vector_store import FAISSVectorStore
+
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Yield lists of up to `size` consecutive items.
+    """
+    iterator = iter(items)
+
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def prefetch(items: Iterable[T], maxsize: int) -> Iterator[T]:
+    """
+    Consume `items` in a background thread, buffering at most `maxsize` of
+    them in a bounded queue. The producer blocks while the queue is full, so
+    a slow consumer caps how far ahead the producer runs. Exceptions raised by
+    the producer are re-raised in the consumer. Closing the iterator stops the
+    producer and waits for it to finish its current item.
+
+    :param items: Iterable to consume in the background.
+    :param maxsize: Maximum number of buffered items.
+    :return: Iterator over the same items, in order.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Gives up once the consumer has left, so the thread never blocks on
+        # a full queue nobody reads.
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def stream_documents_to_store(
+    documents: Iterable[Document],
+    embedder: BaseEmbedder,
+    store: FAISSVectorStore,
+    batch_size: int = 64,
+    queue_size: int = 4,
+) -> int:
+    """
+    Embed and store documents as they are produced.
+
+    Parsing, embedding and writing run as three stages connected by bounded
+    queues: documents are grouped into `batch_size` batches, embedded in a
+    background thread and appended to the index and docstore by the caller.
+    Peak memory is set by `batch_size * queue_size`, not by the document size.
+
+    :param documents: Documents to ingest, typically a lazy parser iterator.
+    :param embedder: Embedder used for the batches.
+    :param store: Open vector store receiving the vectors and documents.
+    :param batch_size: Number of chunks per embedding batch.
+    :param queue_size: Number of batches buffered between stages.
+    :return: Number of documents stored.
+    """
+    parsed = prefetch(batched(documents, batch_size), maxsize=queue_size)
+    embedded = prefetch(
+        ((batch, embedder.embed([doc.text for doc in batch])) for batch in parsed),
+        maxsize=queue_size,
+    )
+
+    count = 0
+    try:
+        for batch, vectors in embedded:
+            store.add_vectors(
+                vectors,
+                [doc.text for doc in batch],
+                [doc.meta for doc in batch],
+            )
+            count += len(batch)
+    finally:
+        # Stop the background stages now, not when the generators are
+        # collected; the embedding stage reads `parsed`, so it goes first.
+        embedded.close()
+        parsed.close()
+
+    return count
@@ -20,4 +20,7 @@ class TokenizerWrapper:
         return self._enc.decode(tokens)
 
     def count_tokens(self, text: str) -> int:
-        return len(self.encode(text))
\ No newline at end of file
+        return len(self.encode(text))
+
+    def decode_token_bytes(self, token: int) -> bytes:
+        return self._enc.decode_single_token_bytes(token)
@@ -1,54 +1,264 @@
 import os
 import logging
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import List, Optional, Set
 
 from tqdm import tqdm
 
-from ..rag.document_store import TinyDocumentStore
+from ..rag.document_store import create_document_store
 from ..rag.vector_store import FAISSVectorStore
-from ..rag.embedder import SentenceTransformersEmbedder
-from ..configuration.templates import RAGConfig
+from ..rag.embedder import BaseEmbedder, create_embedder
+from ..rag.embedding_cache import CachedEmbedder
+from ..configuration.templates import EmbedderBackend, RAGConfig
+from .manifest import IngestionManifest
 from .parser import PDFParser
+from .streaming import stream_documents_to_store
 from ..rag.document_store import Document
 
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+SUPPORTED_EXTENSIONS = (".pdf",)
 
-def add_file_to_store(path: str, config: Optional[RAGConfig] = None):
+_worker_parser: Optional[PDFParser] = None
+
+
+def _embedding_cache_model_name(config: RAGConfig) -> str:
+    """
+    Name under which cached embeddings are stored. Backends and quantization
+    produce slightly different vectors, so each gets its own cache entries.
+    """
+    name = f"{config.embed_model}@{config.embed_backend.value}"
+
+    if config.embed_backend == EmbedderBackend.ONNX:
+        name += "-int8" if config.onnx_quantized else "-fp32"
+
+    return name
+
+
+def _create_ingestion_embedder(config: RAGConfig) -> BaseEmbedder:
+    embedder = create_embedder(config)
+
+    if config.embedding_cache_dir:
+        embedder = CachedEmbedder(
+            embedder,
+            model_name=_embedding_cache_model_name(config),
+            cache_dir=config.embedding_cache_dir,
+            max_entries=config.embedding_cache_size,
+        )
+
+    return embedder
+
+
+def add_file_to_store(
+    path: str,
+    config: Optional[RAGConfig] = None,
+    batch_size: int = 64,
+    queue_size: int = 4,
+    page_workers: int = 1,
+):
     """
     Parses the given file and adds resulting Documents to the vector and document stores.
 
+    Pages are parsed, embedded and stored as a stream, so memory use is bounded
+    by `batch_size * queue_size` chunks regardless of the file size.
+
     :param path: Path to a supported file (currently only PDF).
     :param config: Optional RAGConfig. If not provided, defaults will be used.
+    :param batch_size: Number of chunks per embedding batch.
+    :param queue_size: Number of batches buffered between stages.
+    :param page_workers: Processes extracting the pages of the file in parallel.
     """
+    manifest = IngestionManifest(IngestionManifest.path_for(config.faiss_index_path))
 
-    docs = PDFParser().parse(path)
-
-    if not docs:
-        logger.warning(f"No text found in file: {path}")
+    if manifest.is_unchanged(path):
+        logger.info(f"Skipping unchanged file: {path}")
         return
 
-    logger.info(f"Parsed {len(docs)} documents from {path}")
+    embedder = _create_ingestion_embedder(config)
 
-    embedder = SentenceTransformersEmbedder(config.embed_model)
+    with create_document_store(config.document_store_path) as docstore:
+        store = FAISSVectorStore(
+            embedder=embedder,
+            docstore=docstore,
+            index_path=config.faiss_index_path,
+            index_config=config.index,
+        )
+
+        previous = manifest.remove(path)
+        if previous is not None:
+            store.remove_ids(previous.doc_ids())
+
+        first_id = store.next_id
+        parser = PDFParser(workers=page_workers)
+        documents = tqdm(
+            parser.iter_parse(path, first_id=first_id), desc="Embedding & storing"
+        )
+        count = stream_documents_to_store(
+            documents, embedder, store, batch_size=batch_size, queue_size=queue_size
+        )
+        manifest.record(path, first_id, store.next_id)
 
-    with TinyDocumentStore(config.faiss_index_path.replace(".faiss", ".json")) as docstore:
+        if not count:
+            logger.warning(f"No text found in file: {path}")
+
+        store.save(config.faiss_index_path)
+        manifest.save()
+
+    if isinstance(embedder, CachedEmbedder):
+        embedder.flush()
+
+    logger.info(f"✅ Ingested {count} documents from {path} into vector + doc store.")
+
+
+def find_supported_files(folder: str) -> List[str]:
+    """
+    Recursively list the files in `folder` that a parser can ingest.
+    """
+    return sorted(
+        os.path.join(root, file)
+        for root, _, files in os.walk(folder)
+        for file in files
+        if file.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+
+def _init_parse_worker():
+    global _worker_parser
+    _worker_parser = PDFParser()
+
+
+def _parse_file(path: str) -> List[Document]:
+    return _worker_parser.parse(path)
+
+
+def ingest_folder(
+    folder: str,
+    config: RAGConfig,
+    workers: Optional[int] = None,
+    batch_size: int = 256,
+    checkpoint_every: int = 50,
+):
+    """
+    Ingest every new or changed supported file under `folder`.
+
+    A manifest next to the index records each ingested file and its document
+    id range. Unchanged files are skipped; changed and deleted files have their
+    vectors and documents removed before re-ingestion.
+
+    Files are parsed in a process pool. The calling process is the single
+    writer: it loads the embedding model once, embeds chunks in batches of
+    `batch_size` and appends them to one open vector and document store, saving
+    both, with the manifest, every `checkpoint_every` files.
+
+    :param folder: Folder to ingest.
+    :param config: RAG configuration.
+    :param workers: Number of parser processes. Defaults to the CPU count.
+    :param batch_size: Number of chunks per embedding batch.
+    :param checkpoint_every: Number of files between index checkpoints.
+    """
+    paths = find_supported_files(folder)
+    logger.info(f"📂 Found {len(paths)} supported files in {folder}")
+
+    manifest = IngestionManifest(IngestionManifest.path_for(config.faiss_index_path))
+    changes = manifest.diff(paths, folder)
+    paths = changes.new + changes.changed
+    stale = changes.changed + changes.deleted
+
+    logger.info(
+        f"{len(changes.new)} new, {len(changes.changed)} changed, "
+        f"{len(changes.deleted)} deleted, {len(changes.unchanged)} unchanged files"
+    )
+
+    if not paths and not stale:
+        manifest.save()
+        return
+
+    workers = workers or os.cpu_count() or 1
+    embedder = _create_ingestion_embedder(config)
+    texts: List[str] = []
+    metas: List[dict] = []
+    files_done = 0
+    chunks_done = 0
+
+    with create_document_store(config.document_store_path) as docstore:
         store = FAISSVectorStore(
             embedder=embedder,
             docstore=docstore,
-            index_path=config.faiss_index_path
+            index_path=config.faiss_index_path,
+            index_config=config.index,
         )
 
-        texts = []
-        metas = []
+        def flush():
+            nonlocal chunks_done
+            if texts:
+                store.add_documents(texts, metas)
+                chunks_done += len(texts)
+                texts.clear()
+                metas.clear()
+
+        # One removal for all stale files: HNSW indexes are rebuilt on every
+        # call, compressed ones re-embedding the remaining corpus.
+        store.remove_ids(
+            [doc_id for path in stale for doc_id in manifest.remove(path).doc_ids()]
+        )
+
+        with ProcessPoolExecutor(workers, initializer=_init_parse_worker) as pool:
+            pending: Set[Future] = set()
+            queued = iter(paths)
+            futures_to_paths = {}
+
+            with tqdm(total=len(paths), desc="Ingesting files") as progress:
+                while True:
+                    # Keep a bounded number of parsed files in flight.
+                    while len(pending) < 2 * workers:
+                        path = next(queued, None)
+                        if path is None:
+                            break
+                        future = pool.submit(_parse_file, path)
+                        futures_to_paths[future] = path
+                        pending.add(future)
 
-        for doc in tqdm(docs, desc="Embedding & storing"):
-            texts.append(doc.text)
-            metas.append(doc.meta)
+                    if not pending:
+                        break
 
-        store.add_documents(texts, metas)
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        path = futures_to_paths.pop(future)
+                        progress.update(1)
+                        files_done += 1
+
+                        try:
+                            docs = future.result()
+                        except Exception as e:
+                            logger.warning(f"❌ Failed to parse {path}: {e}")
+                        else:
+                            first_id = store.next_id + len(texts)
+                            manifest.record(path, first_id, first_id + len(docs))
+
+                            for doc in docs:
+                                texts.append(doc.text)
+                                metas.append(doc.meta)
+
+                                if len(texts) >= batch_size:
+                                    flush()
+
+                        # Failed files count too, so a failure never skips
+                        # a checkpoint.
+                        if files_done % checkpoint_every == 0:
+                            flush()
+                            store.save(config.faiss_index_path)
+                            manifest.save()
+                            if isinstance(embedder, CachedEmbedder):
+                                embedder.flush()
+
+        flush()
         store.save(config.faiss_index_path)
+        manifest.save()
+
+    if isinstance(embedder, CachedEmbedder):
+        embedder.flush()
 
-    logger.info(f"✅ Ingested {len(docs)} documents from {path} into vector + doc store.")
\ No newline at end of file
+    logger.info(f"✅ Ingested {chunks_done} chunks from {files_done} files in {folder}.")
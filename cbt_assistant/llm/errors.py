@@ -0,0 +1,8 @@
+class OverloadedError(Exception):
+    """
+    Raised when a request is refused because the queue is full.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many requests in flight")
+        self.retry_after = retry_after
@@ -1,8 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Optional
-from enum import Enum
-from transformers import AutoModelForCausalLM, AutoTokenizer, PreTrainedTokenizer, PreTrainedModel
-from ..configuration.templates import ModelConfig
+from typing import Any, Dict, Iterator, Optional
+from threading import Event, Thread
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    BitsAndBytesConfig,
+    PreTrainedTokenizer,
+    PreTrainedModel,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
+from ..configuration.enums import AvailableHuggingFaceModels  # noqa: F401
+from ..configuration.templates import LoadMode, ModelConfig
+from .prefix_cache import PrefixKVCache
 import torch
 
 
@@ -10,10 +21,32 @@ class Model(ABC):
     def __init__(self, config: ModelConfig):
         self._config = config
 
+    @property
+    def config(self) -> ModelConfig:
+        return self._config
+
+    def add_prefix(self, prefix: str):
+        """
+        Declare text that many prompts start with, so runners that can reuse
+        its prefill do so. Does nothing by default.
+        """
+
+    def warmup(self):
+        """
+        Do one-off work ahead of the first request. Does nothing by default.
+        """
+
     @abstractmethod
     def generate(self, prompt: str) -> str:
         raise NotImplementedError
 
+    @abstractmethod
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate a response and yield text pieces as soon as they are decoded.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def _load_tokenizer(self) -> PreTrainedTokenizer:
         raise NotImplementedError
@@ -23,6 +56,18 @@ class Model(ABC):
         raise NotImplementedError
 
 
+class _StopOnEvent(StoppingCriteria):
+    """
+    Stops generation once the event is set, e.g. when a stream consumer leaves.
+    """
+
+    def __init__(self, event: Event):
+        self._event = event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self._event.is_set()
+
+
 class HuggingFaceModel(Model):
     """
     Universal model runner for HuggingFace causal LLMs.
@@ -33,8 +78,37 @@ class HuggingFaceModel(Model):
         :param config: Model configuration.
         """
         super().__init__(config)
+        self._system_prompt = config.system_prompt
         self._tokenizer = self._load_tokenizer()
         self._model = self._load_model()
+        self._draft_model = self._load_draft_model()
+        self._prefixes = [""]
+        self._prefix_cache = (
+            PrefixKVCache(
+                self._model,
+                self._tokenizer,
+                device=self._config.device,
+                max_entries=config.prefix_cache_size,
+            )
+            if config.prefix_cache_size > 0
+            else None
+        )
+
+    @property
+    def tokenizer(self) -> PreTrainedTokenizer:
+        return self._tokenizer
+
+    @property
+    def causal_lm(self) -> PreTrainedModel:
+        return self._model
+
+    @property
+    def draft_lm(self) -> Optional[PreTrainedModel]:
+        return self._draft_model
+
+    @property
+    def system_prompt(self) -> str:
+        return self._system_prompt
 
     def _load_tokenizer(self) -> PreTrainedTokenizer:
         """
@@ -43,21 +117,83 @@ class HuggingFaceModel(Model):
         :return: HuggingFace tokenizer
         :rtype: PreTrainedTokenizer
         """
-        return AutoTokenizer.from_pretrained(self._model_id)
+        return AutoTokenizer.from_pretrained(self._config.model_id)
 
     def _load_model(self) -> PreTrainedModel:
         """
-        Load and return the model.
+        Load and return the model in the configured load_mode, using
+        `num_threads` intra-op threads when set.
 
         :return: HuggingFace causal language model
         :rtype: PreTrainedModel
         """
-        return AutoModelForCausalLM.from_pretrained(
-            self._config.model_id,
+        if self._config.num_threads:
+            torch.set_num_threads(self._config.num_threads)
+
+        return self._load_causal_lm(self._config.model_id)
+
+    def _load_draft_model(self) -> Optional[PreTrainedModel]:
+        """
+        Load the draft model used for assisted generation, if configured.
+
+        :return: Draft causal language model or None
+        :rtype: Optional[PreTrainedModel]
+        """
+        if self._config.draft_model_id is None:
+            return None
+
+        model = self._load_causal_lm(self._config.draft_model_id)
+        model.generation_config.num_assistant_tokens = self._config.num_draft_tokens
+
+        return model
+
+    def _load_causal_lm(self, model_id: str) -> PreTrainedModel:
+        mode = self._config.load_mode
+
+        if mode == LoadMode.NF4:
+            return AutoModelForCausalLM.from_pretrained(
+                model_id,
+                device_map=self._config.device,
+                quantization_config=BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_compute_dtype=torch.float16,
+                ),
+            )
+
+        model = AutoModelForCausalLM.from_pretrained(
+            model_id,
             device_map=self._config.device,
-            torch_dtype=torch.float32,
-            load_in_4bit=True,
-        )
+            torch_dtype=torch.bfloat16 if mode == LoadMode.BF16 else torch.float32,
+        ).eval()
+
+        if mode == LoadMode.INT8_DYNAMIC:
+            # int8 weights for nn.Linear layers; activations are quantized on
+            # the fly, so no calibration data is needed.
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        return model
+
+    def add_prefix(self, prefix: str):
+        """
+        Cache the prefill of the system prompt followed by `prefix` for prompts
+        starting with it. The system prompt alone is always cached.
+
+        :param prefix: Constant text at the start of prompts, e.g. a template
+            preamble.
+        """
+        if prefix not in self._prefixes:
+            self._prefixes.append(prefix)
+
+    def warmup(self):
+        """
+        Prefill the system prompt and every registered prefix into the prefix
+        cache.
+        """
+        for prefix in self._prefixes:
+            self.prepare_inputs(prefix)
 
     def generate(self, prompt: str) -> str:
         """
@@ -70,20 +206,100 @@ class HuggingFaceModel(Model):
         """
         full_prompt = self._system_prompt + prompt
 
-        inputs = self._tokenizer(full_prompt, return_tensors="pt").to(
-            self._config.device
+        inputs = self.prepare_inputs(prompt)
+        outputs = self._model.generate(**inputs, **self._generation_kwargs())
+        decoded = self._tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+        return decoded[len(full_prompt):].strip()
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate a response, yielding text as tokens are produced.
+
+        Generation runs in a worker thread feeding a TextIteratorStreamer.
+        Closing the iterator early stops generation at the next token.
+
+        :param prompt: Input text
+        :type prompt: str
+        :return: Iterator over decoded text pieces
+        :rtype: Iterator[str]
+        """
+        inputs = self.prepare_inputs(prompt)
+        streamer = TextIteratorStreamer(
+            self._tokenizer, skip_prompt=True, skip_special_tokens=True
         )
-        outputs = self._model.generate(
-            **inputs,
+        stop = Event()
+        errors = []
+
+        def run():
+            try:
+                self._model.generate(
+                    **inputs,
+                    **self._generation_kwargs(),
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_StopOnEvent(stop)]),
+                )
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            stop.set()
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def prepare_inputs(self, prompt: str) -> Dict[str, Any]:
+        """
+        Tokenize the system prompt and `prompt`, starting from the cached
+        prefill of the longest known prefix the prompt begins with.
+
+        :param prompt: Input text
+        :return: Model inputs, with `past_key_values` when a prefix is reused
+        """
+        inputs = dict(
+            self._tokenizer(self._system_prompt + prompt, return_tensors="pt").to(
+                self._config.device
+            )
+        )
+
+        # Assisted generation would hand the cached prefix to the draft model
+        # as well, so prefixes are only reused without one.
+        if self._prefix_cache is None or self._draft_model is not None:
+            return inputs
+
+        prefix = max((p for p in self._prefixes if prompt.startswith(p)), key=len)
+        if not self._system_prompt + prefix:
+            return inputs
+
+        past = self._prefix_cache.past_for(
+            self._system_prompt + prefix, inputs["input_ids"]
+        )
+        if past is not None:
+            inputs["past_key_values"] = past
+
+        return inputs
+
+    def _generation_kwargs(self) -> Dict[str, Any]:
+        kwargs = dict(
             max_new_tokens=self._config.max_tokens,
             temperature=self._config.temperature,
             top_k=self._config.top_k,
-            top_p=self._config.top_p
+            top_p=self._config.top_p,
         )
-        decoded = self._tokenizer.decode(outputs[0], skip_special_tokens=True)
 
-        return decoded[len(full_prompt):].strip()
+        if self._draft_model is not None:
+            # Greedy verification keeps the output identical to plain greedy
+            # decoding of the main model.
+            kwargs.update(assistant_model=self._draft_model, do_sample=False)
 
+        return kwargs
 
-class AvailableHuggingFaceModels(Enum):
-    PHI2 = "microsoft/phi-2"
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import torch
+from transformers import PreTrainedModel, PreTrainedTokenizer
+
+
+# Legacy past-key-values layout: one (key, value) pair per layer, each shaped
+# [batch, heads, sequence, head_dim].
+PastKeyValues = Tuple[Tuple[torch.Tensor, torch.Tensor], ...]
+
+
+def to_legacy(past) -> PastKeyValues:
+    return past.to_legacy_cache() if hasattr(past, "to_legacy_cache") else past
+
+
+class PrefixKVCache:
+    """
+    Bounded LRU of past-key-values for constant prompt prefixes, keyed by
+    prefix text.
+
+    Prefixes are prefilled once; each generation then starts from a copy of
+    the cached keys and values and only prefills the tokens after the prefix.
+    """
+
+    def __init__(
+        self,
+        model: PreTrainedModel,
+        tokenizer: PreTrainedTokenizer,
+        device: str,
+        max_entries: int = 4,
+    ):
+        """
+        :param model: Causal LM computing the prefix keys and values.
+        :param tokenizer: Tokenizer of the model.
+        :param device: Device the prefix is prefilled on.
+        :param max_entries: Maximum number of cached prefixes.
+        """
+        self._model = model
+        self._tokenizer = tokenizer
+        self._device = device
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[List[int], PastKeyValues]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def past_for(self, prefix: str, input_ids: torch.Tensor) -> Optional[PastKeyValues]:
+        """
+        Return a copy of the cached keys and values for the part of
+        `input_ids` covered by `prefix`.
+
+        Only tokens identical in both tokenizations are reused, so a token
+        merged across the prefix boundary is prefilled again, and the last
+        prompt token is always left for the model to process.
+
+        :param prefix: Text `input_ids` was tokenized from starts with.
+        :param input_ids: Token ids of the full prompt, shaped [1, n].
+        :return: Past key values for the shared tokens, or None.
+        """
+        prefix_ids, past = self._get(prefix)
+        prompt_ids = input_ids[0].tolist()
+
+        shared = 0
+        limit = min(len(prefix_ids), len(prompt_ids) - 1)
+        while shared < limit and prefix_ids[shared] == prompt_ids[shared]:
+            shared += 1
+
+        if shared == 0:
+            return None
+
+        return tuple(
+            (k[:, :, :shared].clone(), v[:, :, :shared].clone()) for k, v in past
+        )
+
+    @torch.no_grad()
+    def _get(self, prefix: str) -> Tuple[List[int], PastKeyValues]:
+        with self._lock:
+            if prefix in self._entries:
+                self._entries.move_to_end(prefix)
+                return self._entries[prefix]
+
+            input_ids = self._tokenizer(prefix, return_tensors="pt").input_ids.to(
+                self._device
+            )
+            outputs = self._model(input_ids=input_ids, use_cache=True)
+            entry = (input_ids[0].tolist(), to_legacy(outputs.past_key_values))
+
+            self._entries[prefix] = entry
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+            return entry
@@ -0,0 +1,397 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+import torch
+from pydantic import BaseModel
+from transformers import PreTrainedModel, PreTrainedTokenizer
+from .errors import OverloadedError
+from .models import HuggingFaceModel, Model
+from .prefix_cache import PastKeyValues, to_legacy
+
+
+class SchedulerStats(BaseModel):
+    queue_depth: int
+    active_sequences: int
+    max_batch_size: int
+    batch_occupancy: float
+    decode_steps: int
+    generated_tokens: int
+    tokens_per_second: float
+
+
+class _Sequence:
+    """
+    State of one prompt inside the scheduler.
+    """
+
+    def __init__(self, prompt: str, sink: Optional[Callable[[Optional[str]], None]]):
+        self.prompt = prompt
+        self.sink = sink
+        self.future: Future = Future()
+        self.cancelled = False
+        self.generated: List[int] = []
+        self.next_token = 0
+        self.position = 0
+        self.emitted = 0
+
+    def push(self, text: Optional[str]):
+        if self.sink is not None:
+            self.sink(text)
+
+
+class ContinuousBatchingScheduler(Model):
+    """
+    Shares forward passes of a HuggingFaceModel between concurrent prompts.
+
+    Prompts are queued and admitted into a running batch whenever a slot is
+    free. Every decode step advances all active sequences by one token in a
+    single forward pass, and finished sequences leave the batch right away, so
+    new prompts never wait for the longest sequence of a batch to finish.
+
+    Decoding is greedy, like HuggingFaceModel.generate().
+    """
+
+    def __init__(
+        self,
+        model: HuggingFaceModel,
+        max_batch_size: int = 8,
+        max_queue_size: int = 0,
+        retry_after_seconds: float = 5.0,
+    ):
+        """
+        :param model: Loaded model runner whose weights are shared.
+        :param max_batch_size: Maximum number of sequences per forward pass.
+        :param max_queue_size: Maximum number of prompts waiting for a slot.
+            0 means unbounded; otherwise submitting to a full queue raises
+            OverloadedError.
+        :param retry_after_seconds: Back-off suggested to refused callers.
+        """
+        super().__init__(model.config)
+        self._runner = model
+        self._tokenizer = self._load_tokenizer()
+        self._model = self._load_model()
+        self._max_batch_size = max_batch_size
+        self._retry_after = retry_after_seconds
+        self._queue: "queue.Queue[Optional[_Sequence]]" = queue.Queue(max_queue_size)
+        self._closed = False
+
+        self._active: List[_Sequence] = []
+        self._past: Optional[PastKeyValues] = None
+        self._mask: Optional[torch.Tensor] = None
+
+        self._stats_lock = threading.Lock()
+        self._decode_steps = 0
+        self._occupied_slots = 0
+        self._generated_tokens = 0
+        self._busy_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _load_tokenizer(self) -> PreTrainedTokenizer:
+        return self._runner.tokenizer
+
+    def _load_model(self) -> PreTrainedModel:
+        return self._runner.causal_lm
+
+    def add_prefix(self, prefix: str):
+        self._runner.add_prefix(prefix)
+
+    def warmup(self):
+        self._runner.warmup()
+
+    def submit(self, prompt: str) -> "Future[str]":
+        """
+        Queue a prompt for generation.
+
+        :param prompt: Input text, without the system prompt.
+        :return: Future resolving to the model's textual response.
+        """
+        return self._submit(prompt, sink=None).future
+
+    def generate(self, prompt: str) -> str:
+        return self.submit(prompt).result()
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Queue a prompt and yield its text as tokens are produced. Closing the
+        iterator early frees the sequence's batch slot at the next step.
+        """
+        pieces: "queue.Queue[Optional[str]]" = queue.Queue()
+        sequence = self._submit(prompt, sink=pieces.put)
+
+        try:
+            while True:
+                piece = pieces.get()
+                if piece is None:
+                    break
+                yield piece
+
+            if sequence.future.exception() is not None:
+                raise sequence.future.exception()
+        finally:
+            sequence.cancelled = True
+
+    async def agenerate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Async counterpart of generate_stream() for event-loop callers.
+        """
+        loop = asyncio.get_running_loop()
+        pieces: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        sequence = self._submit(
+            prompt, sink=lambda piece: loop.call_soon_threadsafe(pieces.put_nowait, piece)
+        )
+
+        try:
+            while True:
+                piece = await pieces.get()
+                if piece is None:
+                    break
+                yield piece
+
+            if sequence.future.exception() is not None:
+                raise sequence.future.exception()
+        finally:
+            sequence.cancelled = True
+
+    def stats(self) -> SchedulerStats:
+        """
+        Snapshot of queue depth, batch occupancy and throughput.
+        """
+        with self._stats_lock:
+            steps = self._decode_steps
+            return SchedulerStats(
+                queue_depth=self._queue.qsize(),
+                active_sequences=len(self._active),
+                max_batch_size=self._max_batch_size,
+                batch_occupancy=(
+                    self._occupied_slots / (steps * self._max_batch_size) if steps else 0.0
+                ),
+                decode_steps=steps,
+                generated_tokens=self._generated_tokens,
+                tokens_per_second=(
+                    self._generated_tokens / self._busy_seconds if self._busy_seconds else 0.0
+                ),
+            )
+
+    def close(self):
+        """
+        Stop the scheduler thread after queued prompts are served.
+        """
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _submit(
+        self, prompt: str, sink: Optional[Callable[[Optional[str]], None]]
+    ) -> _Sequence:
+        if self._closed:
+            raise RuntimeError("ContinuousBatchingScheduler is closed")
+
+        sequence = _Sequence(prompt, sink)
+        try:
+            self._queue.put_nowait(sequence)
+        except queue.Full:
+            raise OverloadedError(self._retry_after)
+
+        return sequence
+
+    def _run(self):
+        stopping = False
+
+        while not (stopping and not self._active):
+            while len(self._active) < self._max_batch_size and not stopping:
+                try:
+                    sequence = self._queue.get(block=not self._active)
+                except queue.Empty:
+                    break
+                if sequence is None:
+                    stopping = True
+                    break
+                self._timed(self._try_admit, sequence)
+
+            if self._active:
+                self._timed(self._try_step)
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        finally:
+            with self._stats_lock:
+                self._busy_seconds += time.perf_counter() - start
+
+    def _try_admit(self, sequence: _Sequence):
+        try:
+            self._admit(sequence)
+        except Exception as e:
+            # The running batch is only changed once the prefill succeeded,
+            # so the other sequences carry on.
+            _fail([sequence], e)
+
+    def _try_step(self):
+        try:
+            self._step()
+        except Exception as e:
+            failed = self._active
+            self._active, self._past, self._mask = [], None, None
+            _fail(failed, e)
+
+    @torch.no_grad()
+    def _admit(self, sequence: _Sequence):
+        """
+        Prefill a new sequence and merge its cache into the running batch.
+        """
+        if sequence.cancelled:
+            sequence.future.cancel()
+            return
+
+        inputs = self._runner.prepare_inputs(sequence.prompt)
+        input_ids = inputs["input_ids"]
+        past = inputs.get("past_key_values")
+        cached = past[0][0].shape[2] if past is not None else 0
+        outputs = self._model(
+            input_ids=input_ids[:, cached:], past_key_values=past, use_cache=True
+        )
+
+        sequence.position = input_ids.shape[1]
+        if not self._advance(sequence, int(outputs.logits[0, -1].argmax())):
+            return
+
+        past = to_legacy(outputs.past_key_values)
+        mask = torch.ones_like(input_ids)
+
+        if self._past is None:
+            self._past, self._mask = past, mask
+        else:
+            self._past, self._mask = _concat(self._past, self._mask, past, mask)
+        self._active.append(sequence)
+
+    @torch.no_grad()
+    def _step(self):
+        """
+        Advance every active sequence by one token in a single forward pass.
+        """
+        device = self._config.device
+        batch = len(self._active)
+        input_ids = torch.tensor([[s.next_token] for s in self._active], device=device)
+        position_ids = torch.tensor([[s.position] for s in self._active], device=device)
+        mask = torch.cat([self._mask, self._mask.new_ones((batch, 1))], dim=1)
+
+        outputs = self._model(
+            input_ids=input_ids,
+            attention_mask=mask,
+            position_ids=position_ids,
+            past_key_values=self._past,
+            use_cache=True,
+        )
+        self._past, self._mask = to_legacy(outputs.past_key_values), mask
+        tokens = outputs.logits[:, -1].argmax(dim=-1).tolist()
+
+        keep = []
+        for row, (sequence, token) in enumerate(zip(self._active, tokens)):
+            sequence.position += 1
+            if self._advance(sequence, token):
+                keep.append(row)
+
+        with self._stats_lock:
+            self._decode_steps += 1
+            self._occupied_slots += batch
+
+        if len(keep) < batch:
+            self._retire(keep)
+
+    def _advance(self, sequence: _Sequence, token: int) -> bool:
+        """
+        Record a sampled token and stream new text.
+
+        :return: Whether the sequence stays in the batch.
+        """
+        finished = sequence.cancelled or token == self._tokenizer.eos_token_id
+
+        if not finished:
+            sequence.generated.append(token)
+            sequence.next_token = token
+            with self._stats_lock:
+                self._generated_tokens += 1
+
+            text = self._tokenizer.decode(sequence.generated, skip_special_tokens=True)
+            # Hold back incomplete multi-byte characters until the next token.
+            if not text.endswith("\ufffd") and len(text) > sequence.emitted:
+                sequence.push(text[sequence.emitted :])
+                sequence.emitted = len(text)
+
+            finished = len(sequence.generated) >= self._config.max_tokens
+
+        if finished:
+            text = self._tokenizer.decode(sequence.generated, skip_special_tokens=True)
+            if len(text) > sequence.emitted:
+                sequence.push(text[sequence.emitted :])
+            sequence.future.set_result(text.strip())
+            sequence.push(None)
+
+        return not finished
+
+    def _retire(self, keep: List[int]):
+        """
+        Drop finished rows from the batch and trim padding no row needs.
+        """
+        self._active = [self._active[row] for row in keep]
+
+        if not keep:
+            self._past, self._mask = None, None
+            return
+
+        index = torch.tensor(keep, device=self._mask.device)
+        mask = self._mask[index]
+        first = int(mask.any(dim=0).nonzero()[0])
+
+        self._mask = mask[:, first:]
+        self._past = tuple(
+            (k[index][:, :, first:], v[index][:, :, first:]) for k, v in self._past
+        )
+
+
+def _fail(sequences: List[_Sequence], error: Exception):
+    for sequence in sequences:
+        if not sequence.future.done():
+            sequence.future.set_exception(error)
+            sequence.push(None)
+
+
+def _left_pad(past: PastKeyValues, mask: torch.Tensor, length: int):
+    pad = length - mask.shape[1]
+    if pad == 0:
+        return past, mask
+
+    return (
+        tuple(
+            (
+                torch.nn.functional.pad(k, (0, 0, pad, 0)),
+                torch.nn.functional.pad(v, (0, 0, pad, 0)),
+            )
+            for k, v in past
+        ),
+        torch.nn.functional.pad(mask, (pad, 0)),
+    )
+
+
+def _concat(
+    past_a: PastKeyValues, mask_a: torch.Tensor, past_b: PastKeyValues, mask_b: torch.Tensor
+) -> Tuple[PastKeyValues, torch.Tensor]:
+    """
+    Stack two batches of caches, left-padding the shorter one.
+    """
+    length = max(mask_a.shape[1], mask_b.shape[1])
+    past_a, mask_a = _left_pad(past_a, mask_a, length)
+    past_b, mask_b = _left_pad(past_b, mask_b, length)
+
+    past = tuple(
+        (torch.cat([ka, kb]), torch.cat([va, vb]))
+        for (ka, va), (kb, vb) in zip(past_a, past_b)
+    )
+
+    return past, torch.cat([mask_a, mask_b])
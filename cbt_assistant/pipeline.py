@@ -1,12 +1,30 @@
-from typing import Optional
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
 from .configuration.templates import AppConfig
-from .llm.models import HuggingFaceModel
-from .rag.pipeline import RAGPipeline
-from .semantic_filtering.semantic_filters import SimilaritySemanticFilter
+from .rag.embedder import (
+    BaseEmbedder,
+    BatchingEmbedder,
+    SentenceTransformersEmbedder,
+    SentenceTransformersEmbedderModels,
+    create_embedder,
+)
+from .rag.embedding_cache import LRUEmbeddingCache
+from .response_cache import SemanticResponseCache
+
+if TYPE_CHECKING:
+    from .llm.models import Model
+    from .rag.pipeline import RAGPipeline
+    from .semantic_filtering.semantic_filters import BaseSemanticFilter
+
 
 class Pipeline:
     """
     Main pipeline class that orchestrates the generation of responses.
+
+    Components are created on first use, and the modules that import torch,
+    transformers or faiss are only imported then. Call warmup() to load
+    everything up front, e.g. before a server reports ready.
     """
 
     def __init__(self, config: AppConfig):
@@ -15,28 +33,235 @@ class Pipeline:
         :param config: App configuration.
         """
         self._config = config
-        self._llm = HuggingFaceModel(config.model)
-        self._rag_pipeline = self._create_rag_pipeline()
-        self._semantic_filter = self._create_semantic_filter()
+        self._check_config()
+        self._components: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def _llm(self) -> "Model":
+        return self._component("llm", self._create_llm)
+
+    @property
+    def _embedder(self) -> Optional[BaseEmbedder]:
+        return self._component("embedder", self._create_embedder)
+
+    @property
+    def _rag_pipeline(self) -> Optional["RAGPipeline"]:
+        return self._component("rag_pipeline", self._create_rag_pipeline)
+
+    @property
+    def _semantic_filter(self) -> Optional["BaseSemanticFilter"]:
+        return self._component("semantic_filter", self._create_semantic_filter)
+
+    @property
+    def _response_cache(self) -> Optional[SemanticResponseCache]:
+        return self._component("response_cache", self._create_response_cache)
+
+    def warmup(self):
+        """
+        Load every configured component and run the embedder and the prompt
+        prefix prefill once, so the first request does not pay for them.
+        """
+        self._llm
+        self._rag_pipeline
+        self._semantic_filter
+        self._response_cache
+
+        if self._embedder is not None:
+            self._embedder.embed(["warmup"])
+        self._llm.warmup()
+
+    def _component(self, name: str, factory: Callable[[], Any]) -> Any:
+        if name not in self._components:
+            with self._lock:
+                if name not in self._components:
+                    self._components[name] = factory()
+        return self._components[name]
+
+    def _check_config(self):
+        """
+        Fail on missing files before any model is loaded.
+        """
+        if self._config.semantic_filter is not None and not os.path.exists(
+            self._config.semantic_filter.topics_path
+        ):
+            raise FileNotFoundError(
+                f"Topics file not found: {self._config.semantic_filter.topics_path}"
+            )
+
+        if (
+            self._config.rag is not None
+            and self._config.rag.mmap_index
+            and not os.path.exists(self._config.rag.faiss_index_path)
+        ):
+            raise FileNotFoundError(
+                f"FAISS index not found: {self._config.rag.faiss_index_path}"
+            )
+
+    def _create_llm(self) -> "Model":
+        """
+        Create the model runner, behind a continuous batching scheduler when
+        concurrent requests should share forward passes.
+        """
+        from .llm.models import HuggingFaceModel
+
+        llm = HuggingFaceModel(self._config.model)
+
+        batching = self._config.generation_batching
+        if batching is not None:
+            from .llm.scheduler import ContinuousBatchingScheduler
+
+            return ContinuousBatchingScheduler(
+                llm,
+                max_batch_size=batching.max_batch_size,
+                max_queue_size=batching.max_queue_size,
+                retry_after_seconds=self._config.serving.retry_after_seconds,
+            )
+
+        return llm
+
+    def _create_embedder(self) -> Optional[BaseEmbedder]:
+        """
+        Create the query embedder shared by the semantic filter and the
+        retriever. Its LRU makes each query cost one forward pass per request.
+        """
+        if (
+            self._config.rag is None
+            and self._config.semantic_filter is None
+            and self._config.response_cache is None
+        ):
+            return None
 
-    def _create_rag_pipeline(self) -> Optional[RAGPipeline]:
+        embedder: BaseEmbedder
         if self._config.rag is not None:
+            embedder = create_embedder(self._config.rag)
+        else:
+            embedder = SentenceTransformersEmbedder(
+                SentenceTransformersEmbedderModels.E5_SMALL.value
+            )
+
+        batching = self._config.embedding_batching
+        if batching is not None:
+            embedder = BatchingEmbedder(
+                embedder,
+                max_batch_size=batching.max_batch_size,
+                max_wait_ms=batching.max_wait_ms,
+            )
+
+        return LRUEmbeddingCache(
+            embedder,
+            max_entries=self._config.query_embedding_cache_size,
+        )
+
+    def _create_rag_pipeline(self) -> Optional["RAGPipeline"]:
+        if self._config.rag is not None:
+            from .rag.pipeline import RAGPipeline
+
             return RAGPipeline(
                 config=self._config.rag,
                 model=self._llm,
+                embedder=self._embedder,
             )
         return None
 
-    def _create_semantic_filter(self) -> Optional[SimilaritySemanticFilter]:
-        if self._config.semantic_filter is not None:
-            return SimilaritySemanticFilter(self._config.semantic_filter)
+    def _create_semantic_filter(self) -> Optional["BaseSemanticFilter"]:
+        config = self._config.semantic_filter
+        if config is not None:
+            from .semantic_filtering.cascade import CascadeSemanticFilter
+            from .semantic_filtering.semantic_filters import SimilaritySemanticFilter
+
+            with open(config.topics_path, "r") as f:
+                topics = [line.strip() for line in f if line.strip()]
+
+            if config.cascade:
+                return CascadeSemanticFilter(
+                    topics=topics,
+                    embedder=self._embedder,
+                    threshold=config.threshold,
+                    cache_size=config.decision_cache_size,
+                )
+
+            return SimilaritySemanticFilter(
+                topics=topics,
+                embedder=self._embedder,
+                threshold=config.threshold,
+            )
         return None
 
+    def _create_response_cache(self) -> Optional[SemanticResponseCache]:
+        if self._config.response_cache is not None:
+            return SemanticResponseCache(
+                embedder=self._embedder,
+                max_entries=self._config.response_cache.max_entries,
+                max_distance=self._config.response_cache.max_distance,
+                ttl_seconds=self._config.response_cache.ttl_seconds,
+                fingerprint=self._response_fingerprint,
+            )
+        return None
+
+    def _response_fingerprint(self) -> str:
+        """
+        Identify the model and retrieval state responses depend on, so the
+        response cache is dropped when either changes.
+        """
+        parts = [self._config.model.model_dump_json()]
+
+        if self._config.rag is not None:
+            parts.append(self._config.rag.model_dump_json())
+            for path in (
+                self._config.rag.faiss_index_path,
+                self._config.rag.document_store_path,
+            ):
+                if os.path.exists(path):
+                    stat = os.stat(path)
+                    parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+
+        return "\n".join(parts)
+
     def generate(self, query: str) -> str:
-        if self._semantic_filter and not self._semantic_filter.is_relevant(query):
+        if self._response_cache is not None:
+            cached = self._response_cache.get(query)
+            if cached is not None:
+                return cached
+
+        if self._semantic_filter is not None and not self._semantic_filter.is_relevant(query):
             return self._semantic_filter.get_rejection_message()
 
-        if self._rag_pipeline:
-            return self._llm.generate(query, self._rag_pipeline.run(query))
+        if self._rag_pipeline is not None:
+            response = self._rag_pipeline.run(query)
+        else:
+            response = self._llm.generate(query)
+
+        if self._response_cache is not None:
+            self._response_cache.put(query, response)
+
+        return response
+
+    def generate_stream(self, query: str) -> Iterator[str]:
+        """
+        Same as generate(), yielding the response as it is produced.
+        """
+        if self._response_cache is not None:
+            cached = self._response_cache.get(query)
+            if cached is not None:
+                yield cached
+                return
+
+        if self._semantic_filter is not None and not self._semantic_filter.is_relevant(query):
+            yield self._semantic_filter.get_rejection_message()
+            return
+
+        if self._rag_pipeline is not None:
+            pieces = self._rag_pipeline.run_stream(query)
+        else:
+            pieces = self._llm.generate_stream(query)
+
+        response = []
+        for piece in pieces:
+            response.append(piece)
+            yield piece
 
-        return self._llm.generate(query)
\ No newline at end of file
+        # Only complete responses are cached; an abandoned stream never
+        # gets here.
+        if self._response_cache is not None:
+            self._response_cache.put(query, "".join(response).strip())
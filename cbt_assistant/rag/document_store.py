@@ -4,6 +4,10 @@ from pydantic import BaseModel, Field
 from tinydb import TinyDB, Query
 from typing import Optional
 from enum import Enum
+import json
+import os
+import sqlite3
+import threading
 
 
 class Document(BaseModel):
@@ -20,6 +24,7 @@ class DocumentRecord(Enum):
 class MetaField(Enum):
     SOURCE = "source"
     PAGE = "page"
+    END_PAGE = "end_page"
     CHUNK = "chunk"
     TYPE = "type"
     TOKENS = "tokens"
@@ -37,13 +42,25 @@ class BaseDocumentStore(ABC):
         pass
 
     @abstractmethod
-    def add(self, doc_id: int, text: str, meta: Optional[Dict[str, Any]] = None):
+    def add(self, doc: Document):
+        pass
+
+    @abstractmethod
+    def add_many(self, docs: List[Document]):
         pass
 
     @abstractmethod
     def get(self, doc_id: int) -> Optional[str]:
         pass
 
+    @abstractmethod
+    def get_many(self, doc_ids: List[int]) -> Dict[int, Document]:
+        pass
+
+    @abstractmethod
+    def delete_many(self, doc_ids: List[int]):
+        pass
+
     @abstractmethod
     def save(self):
         pass
@@ -56,6 +73,9 @@ class BaseDocumentStore(ABC):
 class TinyDocumentStore(BaseDocumentStore):
     """
     A simple document store that uses TinyDB to store documents.
+
+    Calls are serialized with a lock, so one open store can be shared by
+    several threads.
     """
 
     TABLE_NAME = "documents"
@@ -67,6 +87,7 @@ class TinyDocumentStore(BaseDocumentStore):
         :param path: Path to the TinyDB database file.
         """
         self._path = path
+        self._lock = threading.RLock()
 
     def __enter__(self):
         """
@@ -79,26 +100,62 @@ class TinyDocumentStore(BaseDocumentStore):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.save()
+        with self._lock:
+            self._db.close()
 
     def add(self, doc: Document):
         """
         Add a document to the store.
         """
-        self._table.insert(doc.model_dump())
+        with self._lock:
+            self._table.insert(doc.model_dump())
+
+    def add_many(self, docs: List[Document]):
+        """
+        Add several documents with a single write of the database file.
+        """
+        with self._lock:
+            self._table.insert_multiple([doc.model_dump() for doc in docs])
 
     def get(self, doc_id: int) -> Optional[str]:
         """
         Retrieve text by doc_id.
         """
         q = Query()
-        result = self._table.get(q.id == doc_id)
+        with self._lock:
+            result = self._table.get(q.id == doc_id)
         return result[DocumentRecord.text.value] if result else None
 
+    def get_many(self, doc_ids: List[int]) -> Dict[int, Document]:
+        """
+        Retrieve several documents with a single table read.
+
+        :param doc_ids: Document ids to look up. Unknown ids are skipped.
+        :return: Mapping from doc_id to Document.
+        """
+        if not doc_ids:
+            return {}
+
+        q = Query()
+        with self._lock:
+            records = self._table.search(q.id.one_of(list(set(doc_ids))))
+
+        return {record["id"]: Document(**record) for record in records}
+
+    def delete_many(self, doc_ids: List[int]):
+        """
+        Remove documents by id with a single write of the database file.
+        """
+        q = Query()
+        with self._lock:
+            self._table.remove(q.id.one_of([int(doc_id) for doc_id in doc_ids]))
+
     def max_id(self) -> int:
         """
         Get the maximum document ID.
         """
-        all_docs = self._table.all()
+        with self._lock:
+            all_docs = self._table.all()
 
         if not all_docs:
             return 0
@@ -106,8 +163,166 @@ class TinyDocumentStore(BaseDocumentStore):
         return max(doc["id"] for doc in all_docs) + 1
 
     def save(self):
-        self._db.close()
+        """
+        Flush buffered writes; the database stays open. The default JSON
+        storage writes on every change, so this only matters for caching
+        storage middleware.
+        """
+        flush = getattr(self._db.storage, "flush", None)
+        if flush is not None:
+            with self._lock:
+                flush()
+
+
+class SQLiteDocumentStore(BaseDocumentStore):
+    """
+    A document store backed by SQLite with an integer primary key on the
+    document id, so lookups and max_id() do not scan the table.
+
+    The connection may be used from any thread; calls are serialized with a
+    lock, so one open store can be shared by concurrent requests.
+    """
+
+    TABLE_NAME = "documents"
+    # Stay below SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds.
+    MAX_QUERY_PARAMS = 900
+
+    def __init__(self, path: str):
+        """
+        Initialize the document store.
+
+        :param path: Path to the SQLite database file.
+        """
+        self._path = path
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        """
+        Context manager entry.
+        """
+        dir_path = os.path.dirname(self._path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} ("
+            "id INTEGER PRIMARY KEY, text TEXT NOT NULL, meta TEXT NOT NULL)"
+        )
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._lock:
+            self.save()
+            self._conn.close()
+
+    def add(self, doc: Document):
+        """
+        Add a document to the store.
+        """
+        self.add_many([doc])
+
+    def add_many(self, docs: List[Document]):
+        """
+        Add several documents in a single transaction.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO {self.TABLE_NAME} (id, text, meta) VALUES (?, ?, ?)",
+                [(doc.id, doc.text, self._dump_meta(doc.meta)) for doc in docs],
+            )
+
+    def get(self, doc_id: int) -> Optional[str]:
+        """
+        Retrieve text by doc_id.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT text FROM {self.TABLE_NAME} WHERE id = ?", (int(doc_id),)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def get_many(self, doc_ids: List[int]) -> Dict[int, Document]:
+        """
+        Retrieve several documents by primary key.
+
+        :param doc_ids: Document ids to look up. Unknown ids are skipped.
+        :return: Mapping from doc_id to Document.
+        """
+        ids = list({int(doc_id) for doc_id in doc_ids})
+        documents = {}
+
+        for start in range(0, len(ids), self.MAX_QUERY_PARAMS):
+            batch = ids[start : start + self.MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, text, meta FROM {self.TABLE_NAME} "
+                    f"WHERE id IN ({placeholders})",
+                    batch,
+                ).fetchall()
+
+            for doc_id, text, meta in rows:
+                documents[doc_id] = Document(
+                    id=doc_id, text=text, meta=json.loads(meta)
+                )
+
+        return documents
+
+    def delete_many(self, doc_ids: List[int]):
+        """
+        Remove documents by id in a single transaction.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"DELETE FROM {self.TABLE_NAME} WHERE id = ?",
+                [(int(doc_id),) for doc_id in doc_ids],
+            )
+
+    def max_id(self) -> int:
+        """
+        Get the next free document ID.
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT MAX(id) FROM {self.TABLE_NAME}").fetchone()
+
+        return 0 if row[0] is None else row[0] + 1
+
+    def save(self):
+        with self._lock:
+            self._conn.commit()
+
+    @staticmethod
+    def _dump_meta(meta: Dict[Any, Any]) -> str:
+        return json.dumps(
+            {
+                key.value if isinstance(key, Enum) else key: value
+                for key, value in meta.items()
+            }
+        )
 
 
 class DocumentStoreList(Enum):
     TINY = TinyDocumentStore
+    SQLITE = SQLiteDocumentStore
+
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def create_document_store(path: str) -> BaseDocumentStore:
+    """
+    Create the document store matching the file extension of `path`:
+    SQLite for .db/.sqlite/.sqlite3, TinyDB otherwise.
+
+    :param path: Path to the document store file.
+    :return: Document store instance. Open it with a `with` block before use.
+    """
+    if path.endswith(SQLITE_EXTENSIONS):
+        return DocumentStoreList.SQLITE.value(path)
+
+    return DocumentStoreList.TINY.value(path)
@@ -1,9 +1,12 @@
-from enum import Enum
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
-from ..configuration.templates import RAGConfig
+from typing import List, Tuple, Union
+from ..configuration.enums import SentenceTransformersEmbedderModels  # noqa: F401
+from ..configuration.templates import EmbedderBackend, RAGConfig
 import numpy as np
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+import queue
+import threading
+import time
 
 
 class BaseEmbedder(ABC):
@@ -37,6 +40,9 @@ class SentenceTransformersEmbedder(BaseEmbedder):
         :param model_name: Name of the sentence-transformers model to use.
         :type model_name: SentenceTransformersEmbedderModels
         """
+        # Deferred so importing this module does not pull in torch.
+        from sentence_transformers import SentenceTransformer
+
         self._model = SentenceTransformer(model_name)
 
     def embed(self, text: List[str]) -> np.ndarray:
@@ -57,6 +63,146 @@ class SentenceTransformersEmbedder(BaseEmbedder):
         return self._model.get_sentence_embedding_dimension()
 
 
-class SentenceTransformersEmbedderModels(str, Enum):
-    E5_SMALL = "intfloat/e5-small-v2"
-    E5_BASE = "intfloat/e5-base-v2"
\ No newline at end of file
+class BatchingEmbedder(BaseEmbedder):
+    """
+    Dynamic micro-batching front for an embedder shared by concurrent callers.
+
+    Calls to embed() are queued; a dispatcher thread collects them for up to
+    `max_wait_ms` or until `max_batch_size` texts are pending, runs one batched
+    forward pass and hands each caller its rows through a future.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        :param embedder: Embedder that computes the batched forward pass.
+        :param max_batch_size: Maximum number of texts per forward pass.
+        :param max_wait_ms: Maximum time to wait for more requests after the
+            first one arrives.
+        """
+        self._embedder = embedder
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def embed(self, text: Union[str, List[str]]) -> np.ndarray:
+        """
+        Compute embedding(s) as part of the next batched forward pass.
+
+        :param text: One or more texts.
+        :return: Embedding(s) as np.ndarray
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        future: Future = Future()
+
+        # Checked and enqueued under the lock, so nothing lands behind the
+        # sentinel put by close().
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchingEmbedder is closed")
+            self._queue.put((texts, future))
+
+        result = future.result()
+
+        return result[0] if isinstance(text, str) else result
+
+    def embedding_dim(self) -> int:
+        return self._embedder.embedding_dim()
+
+    def close(self):
+        """
+        Stop the dispatcher thread after pending requests are served.
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        try:
+            self._serve()
+        finally:
+            self._fail_pending()
+
+    def _fail_pending(self):
+        """
+        Fail requests still queued when the dispatcher exits, so no caller
+        waits forever.
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("BatchingEmbedder is closed"))
+
+    def _serve(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self._max_wait
+
+            while size < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[List[str], Future]]):
+        texts = [t for texts, _ in batch for t in texts]
+
+        try:
+            vectors = np.asarray(self._embedder.embed(texts))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for texts, future in batch:
+            future.set_result(vectors[start : start + len(texts)])
+            start += len(texts)
+
+
+def create_embedder(config: RAGConfig) -> BaseEmbedder:
+    """
+    Create the embedder selected by the RAG configuration.
+
+    :param config: RAG configuration.
+    :return: Embedder instance.
+    """
+    if config.embed_backend == EmbedderBackend.ONNX:
+        # onnxruntime is only needed for this backend.
+        from .onnx_embedder import ONNXEmbedder
+
+        return ONNXEmbedder(
+            config.embed_model,
+            model_dir=config.onnx_model_dir,
+            quantized=config.onnx_quantized,
+        )
+
+    return SentenceTransformersEmbedder(config.embed_model)
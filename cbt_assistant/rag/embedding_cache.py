@@ -0,0 +1,276 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Union
+import numpy as np
+from .embedder import BaseEmbedder
+
+
+class CachedEmbedder(BaseEmbedder):
+    """
+    Content-addressed, disk-backed embedding cache around any embedder.
+
+    Vectors live in a memory-mapped .npy array of slots that doubles in size
+    as needed, up to `max_entries`. Each slot is keyed by a hash of the model
+    name and the text, and the least recently used slots are evicted when the
+    cache is full.
+
+    The slot keys are only written by flush(). A marker file exists while
+    vectors on disk may not match them, and a cache found with the marker,
+    e.g. after a crash, is discarded instead of serving wrong vectors.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    KEYS_FILE = "keys.npy"
+    TICKS_FILE = "ticks.npy"
+    DIRTY_FILE = "dirty"
+    KEY_SIZE = 16
+    INITIAL_SLOTS = 4096
+    # Rows copied at a time when the vectors file grows.
+    COPY_ROWS = 65536
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        model_name: str,
+        cache_dir: str,
+        max_entries: int = 1_000_000,
+    ):
+        """
+        :param embedder: Embedder used to compute cache misses.
+        :param model_name: Name of the embedding model, part of every cache key.
+        :param cache_dir: Directory holding the cache files.
+        :param max_entries: Maximum number of cached vectors. Disk space is
+            only allocated as the cache fills.
+        """
+        self._embedder = embedder
+        self._model_name = model_name
+        self._cache_dir = cache_dir
+        self._capacity = max_entries
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load(embedder.embedding_dim())
+
+    def embed(self, text: Union[str, List[str]]) -> np.ndarray:
+        """
+        Return embeddings for the texts, computing only the cache misses, in a
+        single call to the wrapped embedder.
+
+        :param text: One or more texts.
+        :return: Embedding(s) as np.ndarray
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        keys = [self._key(t) for t in texts]
+        result = np.empty((len(texts), self._vectors.shape[1]), dtype="float32")
+        misses: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            self._tick += 1
+            for pos, key in enumerate(keys):
+                slot = self._slots.get(key)
+                if slot is None:
+                    misses.setdefault(key, []).append(pos)
+                else:
+                    result[pos] = self._vectors[slot]
+                    self._ticks[slot] = self._tick
+
+        if misses:
+            miss_keys = list(misses)
+            vectors = self._embedder.embed([texts[misses[k][0]] for k in miss_keys])
+
+            with self._lock:
+                for key, vector in zip(miss_keys, vectors):
+                    result[misses[key]] = vector
+                self._store(miss_keys, vectors)
+
+        return result[0] if isinstance(text, str) else result
+
+    def embedding_dim(self) -> int:
+        return self._embedder.embedding_dim()
+
+    def flush(self):
+        """
+        Persist the cache index and vectors to disk.
+        """
+        with self._lock:
+            self._vectors.flush()
+            np.save(os.path.join(self._cache_dir, self.KEYS_FILE), self._keys)
+            np.save(os.path.join(self._cache_dir, self.TICKS_FILE), self._ticks)
+
+            if self._dirty:
+                os.remove(os.path.join(self._cache_dir, self.DIRTY_FILE))
+                self._dirty = False
+
+    def _mark_dirty(self):
+        """
+        Create the marker before the first vector write since the last flush.
+        """
+        if not self._dirty:
+            with open(os.path.join(self._cache_dir, self.DIRTY_FILE), "w"):
+                pass
+            self._dirty = True
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self._model_name}\0{text}".encode("utf-8"), digest_size=self.KEY_SIZE
+        ).digest()
+
+    def _load(self, dim: int):
+        vectors_path = os.path.join(self._cache_dir, self.VECTORS_FILE)
+        keys_path = os.path.join(self._cache_dir, self.KEYS_FILE)
+        ticks_path = os.path.join(self._cache_dir, self.TICKS_FILE)
+        dirty_path = os.path.join(self._cache_dir, self.DIRTY_FILE)
+        loaded = False
+
+        if not os.path.exists(dirty_path) and all(
+            os.path.exists(p) for p in (vectors_path, keys_path, ticks_path)
+        ):
+            self._vectors = np.load(vectors_path, mmap_mode="r+")
+            self._keys = np.load(keys_path)
+            self._ticks = np.load(ticks_path)
+            slots = len(self._vectors)
+            loaded = (
+                self._vectors.shape[1] == dim
+                and slots <= self._capacity
+                and len(self._keys) == slots
+                and len(self._ticks) == slots
+            )
+
+        if not loaded:
+            # Old keys must not outlive the vectors they describe.
+            for path in (keys_path, ticks_path, dirty_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+            slots = min(self._capacity, self.INITIAL_SLOTS)
+            self._vectors = np.lib.format.open_memmap(
+                vectors_path, mode="w+", dtype="float32", shape=(slots, dim)
+            )
+            self._keys = np.zeros((slots, self.KEY_SIZE), dtype=np.uint8)
+            self._ticks = np.zeros(slots, dtype=np.int64)
+
+        # A tick of 0 marks an empty slot.
+        used = np.flatnonzero(self._ticks)
+        self._slots = {self._keys[slot].tobytes(): int(slot) for slot in used}
+        self._free = [int(slot) for slot in np.flatnonzero(self._ticks == 0)[::-1]]
+        self._tick = int(self._ticks.max()) if len(used) else 0
+
+    def _store(self, keys: List[bytes], vectors: np.ndarray):
+        # A concurrent call may have stored some of these keys meanwhile.
+        missing = [(k, v) for k, v in zip(keys, vectors) if k not in self._slots]
+        missing = missing[-self._capacity :]
+        if missing:
+            self._mark_dirty()
+
+        if len(missing) > len(self._free):
+            self._grow(len(missing) - len(self._free))
+        self._evict(len(missing) - len(self._free))
+
+        for key, vector in missing:
+            slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+            self._ticks[slot] = self._tick
+            self._slots[key] = slot
+
+    def _grow(self, count: int):
+        """
+        Add at least `count` slots, doubling the vectors file up to capacity.
+        """
+        old = len(self._vectors)
+        size = min(self._capacity, max(2 * old, old + count))
+        if size == old:
+            return
+
+        vectors_path = os.path.join(self._cache_dir, self.VECTORS_FILE)
+        tmp_path = f"{vectors_path}.tmp"
+        vectors = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype="float32", shape=(size, self._vectors.shape[1])
+        )
+        for start in range(0, old, self.COPY_ROWS):
+            stop = min(start + self.COPY_ROWS, old)
+            vectors[start:stop] = self._vectors[start:stop]
+        vectors.flush()
+        os.replace(tmp_path, vectors_path)
+
+        self._vectors = vectors
+        self._keys = np.concatenate(
+            [self._keys, np.zeros((size - old, self.KEY_SIZE), dtype=np.uint8)]
+        )
+        self._ticks = np.concatenate([self._ticks, np.zeros(size - old, dtype=np.int64)])
+        # Lowest new slot last, so it is used first.
+        self._free.extend(range(size - 1, old - 1, -1))
+
+    def _evict(self, count: int):
+        """
+        Free the `count` least recently used slots.
+        """
+        if count <= 0:
+            return
+
+        ticks = np.where(self._ticks == 0, np.iinfo(np.int64).max, self._ticks)
+        victims = np.argpartition(ticks, count - 1)[:count]
+
+        for slot in victims:
+            self._slots.pop(self._keys[slot].tobytes(), None)
+            self._ticks[slot] = 0
+            self._free.append(int(slot))
+
+
+class LRUEmbeddingCache(BaseEmbedder):
+    """
+    Bounded in-memory LRU of embeddings keyed by text.
+
+    Share one instance between every stage that embeds the user query (semantic
+    filter, retriever, ...) so each query costs one forward pass per request.
+    """
+
+    def __init__(self, embedder: BaseEmbedder, max_entries: int = 1024):
+        """
+        :param embedder: Embedder used to compute cache misses.
+        :param max_entries: Maximum number of cached embeddings.
+        """
+        self._embedder = embedder
+        self._max_entries = max_entries
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, text: Union[str, List[str]]) -> np.ndarray:
+        """
+        Return embeddings for the texts, computing only the cache misses, in a
+        single call to the wrapped embedder.
+
+        :param text: One or more texts.
+        :return: Embedding(s) as np.ndarray
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for t in texts:
+                if t in self._cache:
+                    self._cache.move_to_end(t)
+                    found[t] = self._cache[t]
+
+        misses = list(dict.fromkeys(t for t in texts if t not in found))
+        if misses:
+            vectors = np.asarray(self._embedder.embed(misses), dtype="float32")
+
+            with self._lock:
+                for t, vector in zip(misses, vectors):
+                    found[t] = vector
+                    self._cache[t] = vector
+                    self._cache.move_to_end(t)
+
+                while len(self._cache) > self._max_entries:
+                    self._cache.popitem(last=False)
+
+        result = np.stack([found[t] for t in texts])
+
+        return result[0] if isinstance(text, str) else result
+
+    def embedding_dim(self) -> int:
+        return self._embedder.embedding_dim()
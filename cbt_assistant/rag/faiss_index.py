@@ -0,0 +1,399 @@
+from typing import Callable, Optional, Tuple
+import os
+import faiss
+import numpy as np
+from ..configuration.templates import (
+    IndexConfig,
+    IndexMetric,
+    IndexType,
+    VectorEncoding,
+)
+
+
+# FAISS warns when an IVF quantizer sees fewer training points per centroid.
+MIN_POINTS_PER_CENTROID = 39
+# Training on more points than this per centroid only slows k-means down.
+MAX_POINTS_PER_CENTROID = 256
+# Rebuild once the corpus supports at least this many times the current lists.
+REBUILD_GROWTH_FACTOR = 2
+
+METRICS = {
+    IndexMetric.L2: faiss.METRIC_L2,
+    IndexMetric.INNER_PRODUCT: faiss.METRIC_INNER_PRODUCT,
+}
+
+STORAGE = {
+    VectorEncoding.FLOAT32: "Flat",
+    VectorEncoding.FP16: "SQfp16",
+    VectorEncoding.SQ8: "SQ8",
+    VectorEncoding.SQ4: "SQ4",
+}
+
+# Scalar quantizers that learn per-dimension ranges before vectors can be added.
+TRAINED_ENCODINGS = (VectorEncoding.SQ8, VectorEncoding.SQ4)
+# Ranges learned from fewer vectors than this clip much of the corpus, so the
+# flat placeholder is kept until this many vectors have been added.
+MIN_QUANTIZER_TRAINING_POINTS = 4096
+# Scalar quantizer training is a single pass, so it can use a large sample.
+MAX_QUANTIZER_TRAINING_POINTS = 65536
+
+# Returns the original, uncompressed vectors of the given ids, in order.
+VectorLoader = Callable[[np.ndarray], np.ndarray]
+
+
+class FAISSIndexFactory:
+    """
+    Builds FAISS indexes described by an IndexConfig and keeps IVF partitioning
+    in step with the size of the corpus.
+
+    Every index stores explicit vector ids (the docstore ids) and supports
+    removal: IVF indexes natively, all others through IndexIDMap2.
+
+    Rebuilding a compressed (SQ/PQ) index needs the original vectors, since
+    retraining on decoded ones compounds the quantization error each time.
+    Those methods take a `load_vectors` callback for that; lossless indexes
+    are rebuilt from their own contents.
+    """
+
+    def __init__(self, config: Optional[IndexConfig] = None):
+        """
+        :param config: Index configuration. Defaults to an exact flat index.
+        """
+        self._config = config or IndexConfig()
+
+    def create(self, dim: int, train_vectors: Optional[np.ndarray] = None):
+        """
+        Create an empty index, training it on the given vectors if required.
+
+        IVF indexes and 8/4-bit scalar quantizers need vectors to train on. Until
+        there are enough (MIN_QUANTIZER_TRAINING_POINTS for the quantizers), an
+        uncompressed flat index is returned instead and is later replaced by
+        rebuild().
+
+        :param dim: Dimension of the embedding vectors.
+        :param train_vectors: Vectors used to train the index, if any.
+        :return: FAISS index ready for add_with_ids().
+        """
+        n = 0 if train_vectors is None else len(train_vectors)
+        nlist = self._nlist_for(n)
+        metric = METRICS[self._config.metric]
+
+        if n < MIN_QUANTIZER_TRAINING_POINTS and self._config.encoding in TRAINED_ENCODINGS:
+            index = faiss.index_factory(dim, "Flat", metric)
+        else:
+            index = faiss.index_factory(dim, self._description(nlist), metric)
+
+        if not index.is_trained:
+            index.train(self._training_sample(train_vectors, nlist))
+
+        if not ivf_nlist(index):
+            index = faiss.IndexIDMap2(index)
+
+        self.apply_search_params(index)
+
+        return index
+
+    def needs_rebuild(self, index, total: int) -> bool:
+        """
+        Check whether the index should be rebuilt to hold `total` vectors.
+
+        :param index: Current FAISS index.
+        :param total: Number of vectors the index will hold.
+        :return: True if the configured partitioning has outgrown the index.
+        """
+        if self._is_placeholder(index):
+            return total >= MIN_QUANTIZER_TRAINING_POINTS
+
+        target = self._nlist_for(total)
+
+        if target == 0:
+            return False
+
+        current = ivf_nlist(index)
+
+        return current == 0 or target >= REBUILD_GROWTH_FACTOR * current
+
+    def rebuild(
+        self,
+        index,
+        new_vectors: np.ndarray,
+        new_ids: np.ndarray,
+        load_vectors: Optional[VectorLoader] = None,
+    ):
+        """
+        Build a new index, trained for the grown corpus, holding the vectors of
+        `index` plus `new_vectors`. Vector ids are preserved.
+
+        :param index: Current FAISS index.
+        :param new_vectors: Vectors to append.
+        :param new_ids: Ids of the appended vectors.
+        :param load_vectors: Source of the original vectors of a compressed index.
+        :return: New FAISS index.
+        """
+        ids, vectors = original_vectors(index, load_vectors)
+        ids = np.concatenate([ids, np.asarray(new_ids, dtype="int64")])
+        vectors = np.vstack([vectors, new_vectors])
+
+        rebuilt = self.create(index.d, vectors)
+        rebuilt.add_with_ids(vectors, ids)
+
+        return rebuilt
+
+    def remove(self, index, ids: np.ndarray, load_vectors: Optional[VectorLoader] = None):
+        """
+        Remove vectors by id.
+
+        :param index: Current FAISS index.
+        :param ids: Ids of the vectors to remove. Unknown ids are ignored.
+        :param load_vectors: Source of the original vectors of a compressed index.
+        :return: Index without the removed vectors, possibly a new object.
+        """
+        ids = np.asarray(ids, dtype="int64")
+
+        if not is_hnsw(index):
+            index.remove_ids(ids)
+            return index
+
+        # HNSW graphs do not support removal; rebuild from the remaining vectors.
+        kept_ids = stored_ids(index)
+        kept_ids = kept_ids[~np.isin(kept_ids, ids)]
+        kept_ids, vectors = original_vectors(index, load_vectors, kept_ids)
+        rebuilt = self.create(index.d, vectors)
+        rebuilt.add_with_ids(vectors, kept_ids)
+
+        return rebuilt
+
+    def ensure_id_mapped(self, index, load_vectors: Optional[VectorLoader] = None):
+        """
+        Return an index that accepts add_with_ids() and remove_ids(). Indexes
+        written before ids were stored explicitly are rebuilt with their
+        positional ids.
+
+        :param index: Loaded FAISS index.
+        :param load_vectors: Source of the original vectors of a compressed index.
+        :return: The same index, or a rebuilt id-mapped copy.
+        """
+        if ivf_nlist(index) or isinstance(
+            faiss.downcast_index(index), (faiss.IndexIDMap, faiss.IndexIDMap2)
+        ):
+            return index
+
+        ids, vectors = original_vectors(index, load_vectors)
+        mapped = self.create(index.d, vectors)
+        mapped.add_with_ids(vectors, ids)
+
+        return mapped
+
+    def apply_search_params(self, index):
+        """
+        Apply query-time parameters (nprobe, efSearch) to the index.
+        """
+        params = faiss.ParameterSpace()
+
+        if ivf_nlist(index):
+            params.set_index_parameter(index, "nprobe", self._config.nprobe)
+
+        if is_hnsw(index):
+            params.set_index_parameter(index, "efSearch", self._config.ef_search)
+
+    def _is_placeholder(self, index) -> bool:
+        """
+        Check whether `index` is the flat stand-in for a not yet trained encoding.
+        """
+        return self._config.encoding in TRAINED_ENCODINGS and isinstance(
+            base_index(index), faiss.IndexFlat
+        )
+
+    def _nlist_for(self, n: int) -> int:
+        """
+        Number of inverted lists to use for `n` vectors, 0 for a non-IVF index.
+        """
+        if self._config.index_type not in (IndexType.IVF_FLAT, IndexType.IVF_PQ):
+            return 0
+
+        if self._config.index_type == IndexType.IVF_PQ and n < 2**self._config.pq_nbits:
+            return 0
+
+        return min(self._config.nlist, n // MIN_POINTS_PER_CENTROID)
+
+    def _description(self, nlist: int) -> str:
+        """
+        FAISS index_factory string for the configured index type.
+        """
+        config = self._config
+        storage = STORAGE[config.encoding]
+
+        if config.index_type == IndexType.HNSW:
+            if config.encoding == VectorEncoding.FLOAT32:
+                return f"HNSW{config.hnsw_m}"
+            return f"HNSW{config.hnsw_m},{storage}"
+
+        if nlist == 0:
+            return storage
+
+        if config.index_type == IndexType.IVF_PQ:
+            return f"IVF{nlist},PQ{config.pq_m}x{config.pq_nbits}"
+
+        return f"IVF{nlist},{storage}"
+
+    @staticmethod
+    def _training_sample(vectors: Optional[np.ndarray], nlist: int) -> np.ndarray:
+        if nlist:
+            limit = nlist * MAX_POINTS_PER_CENTROID
+        else:
+            limit = MAX_QUANTIZER_TRAINING_POINTS
+
+        if vectors is None or len(vectors) <= limit:
+            return vectors
+
+        rows = np.random.default_rng(0).choice(len(vectors), limit, replace=False)
+
+        return vectors[rows]
+
+
+def ivf_nlist(index) -> int:
+    """
+    Number of inverted lists of an IVF index, 0 for any other index type.
+    """
+    try:
+        return faiss.extract_index_ivf(index).nlist
+    except RuntimeError:
+        return 0
+
+
+def base_index(index):
+    """
+    Return the downcast index stored inside an IndexIDMap/IndexIDMap2 wrapper.
+    """
+    index = faiss.downcast_index(index)
+
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+
+    return index
+
+
+def is_hnsw(index) -> bool:
+    return isinstance(base_index(index), faiss.IndexHNSW)
+
+
+def is_lossless(index) -> bool:
+    """
+    Check whether the index stores vectors uncompressed, so reconstruction
+    returns them exactly.
+    """
+    if ivf_nlist(index):
+        return isinstance(
+            faiss.downcast_index(faiss.extract_index_ivf(index)), faiss.IndexIVFFlat
+        )
+
+    index = base_index(index)
+
+    if isinstance(index, faiss.IndexHNSW):
+        return isinstance(faiss.downcast_index(index.storage), faiss.IndexFlat)
+
+    return isinstance(index, faiss.IndexFlat)
+
+
+def stored_ids(index) -> np.ndarray:
+    """
+    Return the ids of the vectors stored in an index, in storage order.
+    """
+    if index.ntotal == 0:
+        return np.empty(0, dtype="int64")
+
+    wrapper = faiss.downcast_index(index)
+
+    if isinstance(wrapper, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.vector_to_array(wrapper.id_map).astype("int64")
+
+    if ivf_nlist(index):
+        invlists = faiss.extract_index_ivf(index).invlists
+        return np.concatenate(
+            [
+                faiss.rev_swig_ptr(invlists.get_ids(i), invlists.list_size(i)).copy()
+                for i in range(invlists.nlist)
+            ]
+        ).astype("int64")
+
+    # Index without explicit ids: ids are the insertion positions.
+    return np.arange(index.ntotal, dtype="int64")
+
+
+def reconstruct_with_ids(index) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the ids and vectors stored in an index. Lossy for compressed
+    encodings.
+
+    :return: (ids, vectors) with one row per stored vector.
+    """
+    ids = stored_ids(index)
+
+    if not len(ids):
+        return ids, np.empty((0, index.d), dtype="float32")
+
+    wrapper = faiss.downcast_index(index)
+
+    if isinstance(wrapper, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return ids, wrapper.index.reconstruct_n(0, wrapper.ntotal)
+
+    if ivf_nlist(index):
+        faiss.extract_index_ivf(index).set_direct_map_type(faiss.DirectMap.Hashtable)
+        return ids, np.vstack([index.reconstruct(int(i)) for i in ids])
+
+    return ids, index.reconstruct_n(0, index.ntotal)
+
+
+def original_vectors(
+    index,
+    load_vectors: Optional[VectorLoader] = None,
+    ids: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return ids and exact vectors of an index, to rebuild it from. Lossless
+    indexes are reconstructed; compressed ones are read from `load_vectors`.
+
+    :param index: FAISS index.
+    :param load_vectors: Source of the original vectors of a compressed index.
+    :param ids: Subset of the stored ids to return. Defaults to all of them.
+    :return: (ids, vectors) with one row per id.
+    :raises ValueError: If the index is compressed and no loader is given.
+    """
+    if is_lossless(index):
+        all_ids, vectors = reconstruct_with_ids(index)
+        if ids is None:
+            return all_ids, vectors
+        keep = np.isin(all_ids, ids)
+        return all_ids[keep], vectors[keep]
+
+    if load_vectors is None:
+        raise ValueError(
+            "Rebuilding a compressed index needs the original vectors; "
+            "reconstructed ones would add quantization error"
+        )
+
+    ids = stored_ids(index) if ids is None else ids
+    if not len(ids):
+        return ids, np.empty((0, index.d), dtype="float32")
+
+    return ids, np.asarray(load_vectors(ids), dtype="float32")
+
+
+def convert_index(index_path: str, config: IndexConfig):
+    """
+    Rewrite an existing index file in place with a new metric, encoding or
+    index type. Vector ids are preserved. The file is replaced atomically.
+
+    :param index_path: Path to the FAISS index file.
+    :param config: Target index configuration.
+    """
+    index = faiss.read_index(index_path)
+    ids, vectors = reconstruct_with_ids(index)
+
+    factory = FAISSIndexFactory(config)
+    converted = factory.create(index.d, vectors)
+    converted.add_with_ids(vectors, ids)
+
+    tmp_path = f"{index_path}.tmp"
+    faiss.write_index(converted, tmp_path)
+    os.replace(tmp_path, index_path)
@@ -0,0 +1,132 @@
+import os
+from typing import List, Optional, Union
+import numpy as np
+import onnxruntime as ort
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModel, AutoTokenizer
+from .embedder import BaseEmbedder
+
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+ONNX_OPSET = 14
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """
+    Export a sentence-transformers E5 encoder to ONNX, optionally adding a
+    dynamically int8-quantized copy.
+
+    :param model_name: HuggingFace model id, e.g. 'intfloat/e5-small-v2'.
+    :param output_dir: Directory receiving the ONNX files and the tokenizer.
+    :param quantize: Also write an int8 model with dynamic quantization.
+    :return: Path of the model file to serve.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    dummy = tokenizer(["query: export"], return_tensors="pt")
+    input_names = list(dummy.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+    tokenizer.save_pretrained(output_dir)
+
+    if not quantize:
+        return model_path
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+
+    return quantized_path
+
+
+class ONNXEmbedder(BaseEmbedder):
+    """
+    CPU embedder running an exported E5 encoder with ONNX Runtime.
+
+    Applies the same mean pooling and L2 normalization as the
+    sentence-transformers pipeline, so vectors stay compatible with indexes
+    built by SentenceTransformersEmbedder.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        model_dir: str,
+        quantized: bool = True,
+        num_threads: Optional[int] = None,
+        max_length: int = 512,
+    ):
+        """
+        :param model_name: HuggingFace model id, used to export when model_dir
+            does not hold an exported model yet.
+        :param model_dir: Directory with the exported ONNX model and tokenizer.
+        :param quantized: Serve the int8 model instead of the fp32 one.
+        :param num_threads: Intra-op threads for ONNX Runtime. Defaults to all
+            physical cores.
+        :param max_length: Maximum tokens per text.
+        """
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        model_path = os.path.join(model_dir, model_file)
+
+        if not os.path.exists(model_path):
+            export_onnx(model_name, model_dir, quantize=quantized)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self._session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self._max_length = max_length
+        self._dim = self._session.get_outputs()[0].shape[-1]
+
+    def embed(self, text: Union[str, List[str]]) -> np.ndarray:
+        """
+        Generate L2-normalized embeddings for one or more texts.
+
+        :param text: One or more texts.
+        :return: Embedding(s) as a numpy array.
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        encoded = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self._max_length,
+            return_tensors="np",
+        )
+        inputs = {
+            name: value.astype(np.int64)
+            for name, value in encoded.items()
+            if name in self._input_names
+        }
+        hidden = self._session.run(None, inputs)[0]
+
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        vectors = (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+        return vectors[0] if isinstance(text, str) else vectors
+
+    def embedding_dim(self) -> int:
+        return self._dim
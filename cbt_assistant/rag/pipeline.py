@@ -1,10 +1,10 @@
 from ..configuration.templates import RAGConfig
 from ..llm.models import Model
-from .embedder import SentenceTransformersEmbedder
+from .embedder import BaseEmbedder, create_embedder
 from .vector_store import FAISSVectorStore
-from .document_store import TinyDocumentStore
+from .document_store import create_document_store
 from .prompt_formatter import PromptFormatter, PromptStyle
-from typing import Optional
+from typing import Iterator, Optional
 
 
 class RAGPipeline:
@@ -13,26 +13,41 @@ class RAGPipeline:
         config: RAGConfig,
         model: Model,
         formatter: Optional[PromptFormatter] = None,
+        embedder: Optional[BaseEmbedder] = None,
     ):
         self._config = config
         self._model = model
 
-        self._embedder = SentenceTransformersEmbedder(config.embed_model)
-        self._docstore = TinyDocumentStore()
+        self._embedder = embedder or create_embedder(config)
+        # Opened once for the pipeline's lifetime and shared by every request;
+        # the stores serialize access themselves.
+        self._docstore = create_document_store(config.document_store_path).__enter__()
         self._store = FAISSVectorStore(
             embedder=self._embedder,
             docstore=self._docstore,
             index_path=config.faiss_index_path,
+            index_config=config.index,
+            read_only=config.mmap_index,
         )
 
         self._formatter = formatter or PromptFormatter(style=PromptStyle.PLAIN)
+        self._model.add_prefix(self._formatter.preamble())
 
-    def run(self, query: str) -> str:
-        with self._docstore:
-            documents = self._store.search(query, k=self._config.top_k)
+    def build_prompt(self, query: str) -> str:
+        documents = self._store.search(query, k=self._config.top_k)
 
         context = "\n".join(doc.text for doc in documents if doc is not None)
 
-        prompt = self._formatter.build(context=context, question=query)
+        return self._formatter.build(context=context, question=query)
+
+    def run(self, query: str) -> str:
+        return self._model.generate(self.build_prompt(query))
+
+    def run_stream(self, query: str) -> Iterator[str]:
+        return self._model.generate_stream(self.build_prompt(query))
 
-        return self._model.generate(prompt)
\ No newline at end of file
+    def close(self):
+        """
+        Close the document store.
+        """
+        self._docstore.__exit__(None, None, None)
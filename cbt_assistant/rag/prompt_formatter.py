@@ -10,14 +10,23 @@ class PromptFormatter:
     def __init__(self, style: PromptStyle = PromptStyle.PLAIN):
         self._style = style
 
+    def preamble(self) -> str:
+        """
+        Constant text every prompt of this style starts with.
+        """
+        if self._style == PromptStyle.PLAIN:
+            return "Use the context below to answer the question.\n\nContext:\n"
+
+        raise ValueError(f"Unknown prompt style: {self._style}")
+
     def build(self, context: str, question: str) -> str:
         context = context.strip()
         question = question.strip()
 
         if self._style == PromptStyle.PLAIN:
             return (
-                "Use the context below to answer the question.\n\n"
-                f"Context:\n{context}\n\n"
+                self.preamble()
+                + f"{context}\n\n"
                 f"Question:\n{question}\n\n"
                 "Answer:"
             )
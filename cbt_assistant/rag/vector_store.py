@@ -1,11 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import faiss
+import numpy as np
 from enum import Enum
 import os
 from .embedder import BaseEmbedder
+from .faiss_index import FAISSIndexFactory
+from ..configuration.templates import IndexConfig
 from ..rag.document_store import BaseDocumentStore, Document
 
+# Documents re-embedded per call when a compressed index is rebuilt.
+REEMBED_BATCH_SIZE = 1024
+
 
 class BaseVectorStore(ABC):
     @abstractmethod
@@ -26,6 +32,19 @@ class BaseVectorStore(ABC):
         """
         pass
 
+    @abstractmethod
+    def search_many(
+        self, queries: List[str], k: int = 5
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for the top-k closest documents for several queries at once.
+
+        :param queries: Query strings.
+        :param k: Number of nearest documents to return per query.
+        :return: For each query, a list of (document, distance) pairs.
+        """
+        pass
+
     @abstractmethod
     def save(self, path: str):
         """
@@ -54,6 +73,8 @@ class FAISSVectorStore(BaseVectorStore):
         embedder: BaseEmbedder,
         docstore: BaseDocumentStore,
         index_path: Optional[str] = None,
+        index_config: Optional[IndexConfig] = None,
+        read_only: bool = False,
     ):
         """
         Initialize the vector store.
@@ -61,9 +82,15 @@ class FAISSVectorStore(BaseVectorStore):
         :param embedder: Embedding model.
         :param docstore: Document store.
         :param index_path: Path to the FAISS index file.
+        :param index_config: Index type and parameters used for new indexes.
+        :param read_only: Memory-map an existing index file instead of reading it
+            into memory. Processes mapping the same file share its page-cache
+            pages. The store then rejects writes.
         """
         self._embedder = embedder
         self._docstore = docstore
+        self._factory = FAISSIndexFactory(index_config)
+        self._read_only = read_only
         self._next_id = self._docstore.max_id()
         self._index = self._get_index(index_path, self._embedder.embedding_dim())
 
@@ -75,10 +102,24 @@ class FAISSVectorStore(BaseVectorStore):
         :param dim: Dimension of the embedding vectors.
         :return: FAISS index.
         """
+        if self._read_only:
+            if not index_path or not os.path.exists(index_path):
+                raise FileNotFoundError(f"Read-only index not found: {index_path}")
+
+            index = faiss.read_index(
+                index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            self._factory.apply_search_params(index)
+            return index
+
         if index_path and os.path.exists(index_path):
-            return faiss.read_index(index_path)
+            index = self._factory.ensure_id_mapped(
+                faiss.read_index(index_path), self._load_vectors
+            )
+            self._factory.apply_search_params(index)
+            return index
 
-        return faiss.IndexFlatL2(dim)
+        return self._factory.create(dim)
 
     def add_documents(self, texts: List[str], metas: Optional[List[dict]] = None):
         """
@@ -87,26 +128,130 @@ class FAISSVectorStore(BaseVectorStore):
         :param texts: List of document texts.
         :param metas: List of document metadata.
         """
-        vectors = self._embedder.embed(texts).astype("float32")
-        self._index.add(vectors)
+        self.add_vectors(self._embedder.embed(texts), texts, metas)
 
+    def add_vectors(
+        self,
+        vectors: np.ndarray,
+        texts: List[str],
+        metas: Optional[List[dict]] = None,
+    ):
+        """
+        Add documents whose embeddings were computed by the caller.
+
+        :param vectors: Embeddings of the texts, one row per text.
+        :param texts: List of document texts.
+        :param metas: List of document metadata.
+        """
+        if self._read_only:
+            raise RuntimeError("Cannot add documents to a read-only vector store")
+
+        vectors = np.asarray(vectors, dtype="float32")
+        ids = np.arange(self._next_id, self._next_id + len(vectors), dtype="int64")
+
+        if self._factory.needs_rebuild(self._index, self._index.ntotal + len(vectors)):
+            self._index = self._factory.rebuild(
+                self._index, vectors, ids, self._load_vectors
+            )
+        else:
+            self._index.add_with_ids(vectors, ids)
+
+        docs = []
         for i, text in enumerate(texts):
             meta = metas[i] if metas and i < len(metas) else {}
-            doc = Document(id=self._next_id, text=text, meta=meta)
-            self._docstore.add(doc)
+            docs.append(Document(id=self._next_id, text=text, meta=meta))
             self._next_id += 1
 
+        self._docstore.add_many(docs)
+
+    def remove_ids(self, doc_ids: List[int]):
+        """
+        Remove documents from the index and the docstore.
+
+        :param doc_ids: Ids of the documents to remove.
+        """
+        if self._read_only:
+            raise RuntimeError("Cannot remove documents from a read-only vector store")
+
+        if not doc_ids:
+            return
+
+        self._index = self._factory.remove(
+            self._index, np.asarray(doc_ids), self._load_vectors
+        )
+        self._docstore.delete_many(list(doc_ids))
+
+    def _load_vectors(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Re-embed stored documents, so compressed indexes are retrained on exact
+        vectors instead of their lossy reconstructions.
+
+        :param ids: Ids of indexed documents.
+        :return: Embeddings, one row per id.
+        """
+        ids = [int(i) for i in ids]
+        documents = self._docstore.get_many(ids)
+        missing = [i for i in ids if i not in documents]
+
+        if missing:
+            raise ValueError(
+                f"{len(missing)} indexed documents are missing from the docstore"
+            )
+
+        return np.vstack(
+            [
+                self._embedder.embed(
+                    [documents[i].text for i in ids[start : start + REEMBED_BATCH_SIZE]]
+                ).astype("float32")
+                for start in range(0, len(ids), REEMBED_BATCH_SIZE)
+            ]
+        )
+
+    @property
+    def next_id(self) -> int:
+        """
+        Id that the next added document will receive.
+        """
+        return self._next_id
+
     def search(self, query: str, k: int = 5) -> List[Document]:
-        vec = self._embedder.embed([query]).astype("float32")
-        _, indices = self._index.search(vec, k)
+        return [doc for doc, _ in self.search_many([query], k=k)[0]]
+
+    def search_many(
+        self, queries: List[str], k: int = 5
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Embed all queries in one call, run one batched FAISS search and resolve
+        every hit with a single docstore read.
+
+        :param queries: Query strings.
+        :param k: Number of nearest documents to return per query.
+        :return: For each query, a list of (document, distance) pairs, best hit
+            first. With an inner-product index the distance is a similarity
+            score. Hits missing from the docstore are dropped.
+        """
+        if not queries:
+            return []
+
+        vectors = self._embedder.embed(queries).astype("float32")
+        distances, indices = self._index.search(vectors, k)
+
+        hit_ids = {int(i) for i in indices.ravel() if i >= 0}
+        documents = self._docstore.get_many(list(hit_ids))
 
         return [
-            self._docstore.get(i)
-            for i in indices[0]
-            if self._docstore.get(i) is not None
+            [
+                (documents[int(i)], float(d))
+                for d, i in zip(row_distances, row_indices)
+                if int(i) in documents
+            ]
+            for row_distances, row_indices in zip(distances, indices)
         ]
 
     def save(self, index_path: str):
+        if self._read_only:
+            raise RuntimeError("Cannot save a read-only vector store")
+
         ensure_dir_exists(index_path)
         faiss.write_index(self._index, index_path)
         self._docstore.save()
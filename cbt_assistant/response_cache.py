@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+import numpy as np
+from .rag.embedder import BaseEmbedder
+
+
+class SemanticResponseCache:
+    """
+    Bounded cache of generated responses keyed by query embedding.
+
+    A lookup returns the stored response of the most similar cached query when
+    its cosine distance to the new query is at most `max_distance`. Entries are
+    evicted least recently used first and expire after `ttl_seconds`. The
+    whole cache is dropped when `fingerprint()` changes, e.g. after the index
+    or the model configuration changed.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        max_entries: int = 1024,
+        max_distance: float = 0.02,
+        ttl_seconds: Optional[float] = 3600,
+        fingerprint: Optional[Callable[[], str]] = None,
+    ):
+        """
+        :param embedder: Embedder for queries; share the pipeline's query
+            embedder so a lookup costs no extra forward pass.
+        :param max_entries: Maximum number of cached responses.
+        :param max_distance: Maximum cosine distance between a query and a
+            cached query for a hit. E5 models score unrelated sentences at a
+            cosine similarity of 0.7-0.8, so only very small distances mean
+            the same question.
+        :param ttl_seconds: Lifetime of an entry, or None to keep entries
+            until evicted.
+        :param fingerprint: Returns a string identifying everything a cached
+            response depends on.
+        """
+        self._embedder = embedder
+        self._max_entries = max_entries
+        self._max_distance = max_distance
+        self._ttl = ttl_seconds
+        self._fingerprint = fingerprint
+        self._lock = threading.Lock()
+
+        # One row per slot; `_entries` maps used slots to responses in LRU
+        # order.
+        self._vectors = np.zeros((max_entries, embedder.embedding_dim()), dtype="float32")
+        self._expires = np.zeros(max_entries, dtype="float64")
+        self._used = np.zeros(max_entries, dtype=bool)
+        self._entries: "OrderedDict[int, str]" = OrderedDict()
+        self._version = fingerprint() if fingerprint else None
+
+    def get(self, query: str) -> Optional[str]:
+        """
+        Return the cached response for a similar query, if any.
+
+        :param query: User's question.
+        :return: Cached response or None.
+        """
+        vector = self._embed(query)
+
+        with self._lock:
+            self._check_version()
+            # Expired entries are dropped first, so they never shadow a live
+            # entry that is slightly further away.
+            for slot in np.flatnonzero(self._used & (self._expires < time.monotonic())):
+                self._free(int(slot))
+
+            if not self._entries:
+                return None
+
+            slots = np.flatnonzero(self._used)
+            similarities = self._vectors[slots] @ vector
+            best = int(np.argmax(similarities))
+            slot = int(slots[best])
+
+            if 1 - similarities[best] > self._max_distance:
+                return None
+
+            self._entries.move_to_end(slot)
+            return self._entries[slot]
+
+    def put(self, query: str, response: str):
+        """
+        Store the response generated for a query.
+        """
+        vector = self._embed(query)
+        expires = time.monotonic() + self._ttl if self._ttl is not None else float("inf")
+
+        with self._lock:
+            self._check_version()
+            if len(self._entries) >= self._max_entries:
+                self._free(next(iter(self._entries)))
+
+            slot = int(np.flatnonzero(~self._used)[0])
+            self._vectors[slot] = vector
+            self._expires[slot] = expires
+            self._used[slot] = True
+            self._entries[slot] = response
+
+    def invalidate(self):
+        """
+        Drop every cached response.
+        """
+        with self._lock:
+            self._clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(self._embedder.embed(query), dtype="float32").reshape(-1)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _check_version(self):
+        if self._fingerprint is None:
+            return
+
+        version = self._fingerprint()
+        if version != self._version:
+            self._clear()
+            self._version = version
+
+    def _free(self, slot: int):
+        del self._entries[slot]
+        self._used[slot] = False
+
+    def _clear(self):
+        self._entries.clear()
+        self._used[:] = False
@@ -0,0 +1,236 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from pydantic import BaseModel
+from cbt_assistant.rag.embedder import BaseEmbedder
+from cbt_assistant.semantic_filtering.semantic_filters import (
+    BaseSemanticFilter,
+    FilterStage,
+    RelevanceDecision,
+    SimilaritySemanticFilter,
+)
+
+# Words that carry no topic on their own. A query made only of these is small
+# talk and is rejected without an embedding.
+STOPWORDS = frozenset(
+    """
+    a about am an and any are as at be can could do does for from have how i
+    if in is it its me my no not of on or please so that the this to up us was
+    we what when where which who why will with would you your
+    hi hello hey hiya yo thanks thank thx ok okay cool bye goodbye yes yeah
+    good morning afternoon evening night there
+    """.split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Any character other than whitespace and ASCII punctuation.
+_OTHER_WORD = re.compile(r"[^\s!-/:-@\[-`{-~]")
+
+# Single-word topics specific enough to accept a query on their own. Other
+# one-word topics ("blaming", "labeling", "depression") also occur outside
+# CBT, so queries matching only those are left to the embedding stage.
+HIGH_PRECISION_TERMS = frozenset(
+    ["cbt", "catastrophizing", "decatastrophizing", "psychoeducation"]
+)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used as the decision cache key: lowercase, single spaces,
+    no surrounding punctuation.
+    """
+    return " ".join(query.lower().split()).strip(" .,!?;:'\"")
+
+
+def _words(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _tokens(words: List[str]) -> Tuple[str, ...]:
+    # A plural "s" is dropped so "thought records" matches "thought record".
+    return tuple(
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in words
+    )
+
+
+class CascadeStats(BaseModel):
+    total: int
+    stage_counts: Dict[FilterStage, int]
+    hit_rates: Dict[FilterStage, float]
+
+
+class LexicalStage:
+    """
+    Keyword stage built from the topics file.
+
+    Accepts a query that contains a multi-word topic as a phrase, e.g.
+    "thought records" or "CBT for insomnia", or one of a few unambiguous
+    single-word topics, and rejects a query with no words outside the
+    small-talk list. Everything else is left undecided.
+    """
+
+    def __init__(
+        self, topics: List[str], high_precision_terms: FrozenSet[str] = HIGH_PRECISION_TERMS
+    ):
+        """
+        :param topics: Topics of the semantic filter.
+        :param high_precision_terms: Single-word topics that may accept a
+            query on their own.
+        """
+        # First token -> (phrase tokens, topic), longest phrase first.
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        terms = set(_tokens(sorted(high_precision_terms)))
+
+        for topic in topics:
+            tokens = _tokens(_words(topic))
+            if len(tokens) > 1 or (tokens and tokens[0] in terms):
+                self._phrases.setdefault(tokens[0], []).append((tokens, topic))
+
+        for candidates in self._phrases.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+
+    def classify(self, query: str) -> Optional[RelevanceDecision]:
+        """
+        :param query: User's question or input
+        :return: Decision, or None when the query is ambiguous
+        """
+        words = _words(query)
+
+        # Checked before plural stripping, which would turn "this" into "thi".
+        # Queries with words the tokenizer does not cover, e.g. non-Latin
+        # scripts or emoji, are left to the embedding stage.
+        if (
+            words
+            and all(w in STOPWORDS for w in words)
+            and not _OTHER_WORD.search(_TOKEN.sub(" ", query.lower()))
+        ):
+            return RelevanceDecision(
+                query=query, score=0.0, topic="", relevant=False, stage=FilterStage.LEXICAL
+            )
+
+        tokens = _tokens(words)
+
+        for i, token in enumerate(tokens):
+            for phrase, topic in self._phrases.get(token, ()):
+                if tokens[i : i + len(phrase)] == phrase:
+                    return RelevanceDecision(
+                        query=query,
+                        score=1.0,
+                        topic=topic,
+                        relevant=True,
+                        stage=FilterStage.LEXICAL,
+                    )
+
+        return None
+
+
+class CascadeSemanticFilter(BaseSemanticFilter):
+    """
+    Semantic filter that tries cheap stages before embedding a query:
+
+    1. an exact-match LRU of past decisions keyed by the normalized query,
+    2. a lexical stage built from the topics file,
+    3. embedding similarity, for the queries still undecided.
+
+    Per-stage hit rates are available from stats(). Safe to share across
+    threads.
+    """
+
+    def __init__(
+        self,
+        topics: List[str],
+        embedder: BaseEmbedder,
+        threshold: float = 0.45,
+        cache_size: int = 4096,
+    ):
+        """
+        :param topics: List of topics to check relevance against
+        :param embedder: Embedding model
+        :param threshold: Similarity threshold for the embedding stage
+        :param cache_size: Maximum number of cached decisions
+        """
+        self._lexical = LexicalStage(topics)
+        self._similarity = SimilaritySemanticFilter(topics, embedder, threshold)
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, RelevanceDecision]" = OrderedDict()
+        self._counts = {stage: 0 for stage in FilterStage}
+        self._lock = threading.Lock()
+
+    def classify_many(self, queries: List[str]) -> List[RelevanceDecision]:
+        """
+        Classify queries, embedding only those no cheaper stage decides, in a
+        single batch.
+        :param queries: User questions or inputs
+        :return: One decision per query, in order
+        """
+        keys = [normalize_query(q) for q in queries]
+        decisions: List[Optional[RelevanceDecision]] = [None] * len(queries)
+        undecided: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, (query, key) in enumerate(zip(queries, keys)):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    decisions[i] = cached.model_copy(
+                        update={"query": query, "stage": FilterStage.CACHE}
+                    )
+
+        for i, (query, key) in enumerate(zip(queries, keys)):
+            if decisions[i] is None:
+                decisions[i] = self._lexical.classify(query)
+            if decisions[i] is None:
+                undecided.setdefault(key, []).append(i)
+
+        if undecided:
+            embedded = self._similarity.classify_many(
+                [queries[positions[0]] for positions in undecided.values()]
+            )
+            for positions, decision in zip(undecided.values(), embedded):
+                for i in positions:
+                    decisions[i] = decision.model_copy(update={"query": queries[i]})
+
+        with self._lock:
+            for key, decision in zip(keys, decisions):
+                self._counts[decision.stage] += 1
+                if decision.stage != FilterStage.CACHE:
+                    self._cache[key] = decision
+                    self._cache.move_to_end(key)
+
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return decisions
+
+    def is_relevant(self, query: str) -> bool:
+        """
+        Check if the given query is relevant to any of the predefined topics.
+        :param query: User's question or input
+        :return: True if relevant, False otherwise
+        """
+        return self.classify(query).relevant
+
+    def explain(self, query: str, decision: Optional[RelevanceDecision] = None) -> str:
+        return self._similarity.explain(query, decision or self.classify(query))
+
+    def get_rejection_message(self) -> str:
+        return self._similarity.get_rejection_message()
+
+    def stats(self) -> CascadeStats:
+        """
+        Number of decisions made by each stage and its share of all decisions.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+
+        total = sum(counts.values())
+
+        return CascadeStats(
+            total=total,
+            stage_counts=counts,
+            hit_rates={
+                stage: count / total if total else 0.0 for stage, count in counts.items()
+            },
+        )
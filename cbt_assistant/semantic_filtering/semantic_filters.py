@@ -1,12 +1,51 @@
 from abc import ABC, abstractmethod
+from enum import Enum
 from typing import List, Optional
-import torch
-import torch.nn.functional as F
+import numpy as np
+from pydantic import BaseModel, ConfigDict
 from cbt_assistant.rag.embedder import BaseEmbedder
 from cbt_assistant.semantic_filtering.rejection import RejectionMessageGenerator
 
 
+class FilterStage(str, Enum):
+    CACHE = "cache"
+    LEXICAL = "lexical"
+    EMBEDDING = "embedding"
+
+
+class RelevanceDecision(BaseModel):
+    """
+    Outcome of classifying one query. Immutable, so it can be handed between
+    threads and kept for explain().
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    query: str
+    score: float
+    topic: str
+    relevant: bool
+    stage: FilterStage = FilterStage.EMBEDDING
+
+
 class BaseSemanticFilter(ABC):
+    @abstractmethod
+    def classify_many(self, queries: List[str]) -> List[RelevanceDecision]:
+        """
+        Classify several queries at once.
+        :param queries: User questions or inputs
+        :return: One decision per query, in order
+        """
+        raise NotImplementedError
+
+    def classify(self, query: str) -> RelevanceDecision:
+        """
+        Classify a single query.
+        :param query: User's question or input
+        :return: Relevance decision
+        """
+        return self.classify_many([query])[0]
+
     @abstractmethod
     def is_relevant(self, query: str) -> bool:
         """
@@ -17,16 +56,24 @@ class BaseSemanticFilter(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def explain(self, query: str) -> str:
+    def explain(self, query: str, decision: Optional[RelevanceDecision] = None) -> str:
         """
         Provide explanation or diagnostic about the relevance decision.
         :param query: User's question or input
+        :param decision: Decision to explain; classified again if omitted
         :return: Human-readable explanation string
         """
         raise NotImplementedError
 
 
 class SimilaritySemanticFilter(BaseSemanticFilter):
+    """
+    Accepts queries whose cosine similarity to the closest topic reaches the
+    threshold.
+
+    Holds no per-query state, so one instance can serve concurrent requests.
+    """
+
     def __init__(self, topics: List[str], embedder: BaseEmbedder, threshold: float = 0.45):
         """
         Initialize the SimilaritySemanticFilter.
@@ -37,40 +84,66 @@ class SimilaritySemanticFilter(BaseSemanticFilter):
         self._topics = topics
         self._embedder = embedder
         self._threshold = threshold
-        self._topic_vectors = torch.tensor(self._embedder.embed(self._topics), dtype=torch.float32)
-        self._last_decision: Optional[tuple[float, bool]] = None
+        self._topic_vectors = self._normalize(self._embedder.embed(self._topics))
+        self._topic_vectors.setflags(write=False)
         self._rejection_generator = RejectionMessageGenerator()
 
+    def classify_many(self, queries: List[str]) -> List[RelevanceDecision]:
+        """
+        Embed the queries in one batch and score them against every topic
+        with a single matrix product.
+        :param queries: User questions or inputs
+        :return: One decision per query, in order
+        """
+        if not queries:
+            return []
+
+        query_vectors = self._normalize(self._embedder.embed(list(queries)))
+        sims = query_vectors @ self._topic_vectors.T
+        best = sims.argmax(axis=1)
+        scores = sims[np.arange(len(queries)), best]
+
+        return [
+            RelevanceDecision(
+                query=query,
+                score=float(score),
+                topic=self._topics[topic],
+                relevant=bool(score >= self._threshold),
+            )
+            for query, topic, score in zip(queries, best, scores)
+        ]
+
     def is_relevant(self, query: str) -> bool:
         """
         Check if the given query is relevant to any of the predefined topics.
         :param query: User's question or input
         :return: True if relevant, False otherwise
         """
-        query_vector = torch.tensor(self._embedder.embed([query])[0], dtype=torch.float32)
-        sims = F.cosine_similarity(query_vector.unsqueeze(0), self._topic_vectors)
-        max_score = sims.max().item()
-        self._last_decision = (max_score, max_score >= self._threshold)
+        return self.classify(query).relevant
 
-        return self._last_decision[1]
-
-    def explain(self, query: str) -> str:
+    def explain(self, query: str, decision: Optional[RelevanceDecision] = None) -> str:
         """
         Provide explanation or diagnostic about the relevance decision.
         :param query: User's question or input
+        :param decision: Decision to explain; classified again if omitted
         :return: Human-readable explanation string
         """
-        if self._last_decision is None:
-            raise RuntimeError("is_relevant() must be called before explain()")
-
-        score, decision = self._last_decision
+        decision = decision or self.classify(query)
 
         return (
             f"Query: '{query}'\n"
-            f"Max similarity to topics: {score:.2f} (threshold: {self._threshold})\n"
-            f"Decision: {'Relevant' if decision else 'Irrelevant'}\n"
+            f"Max similarity to topics: {decision.score:.2f} (threshold: {self._threshold})\n"
+            f"Closest topic: {decision.topic}\n"
+            f"Decision: {'Relevant' if decision.relevant else 'Irrelevant'}"
+            f" ({decision.stage.value} stage)\n"
             f"Topics checked: {', '.join(self._topics)}"
         )
 
     def get_rejection_message(self) -> str:
         return self._rejection_generator.generate()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
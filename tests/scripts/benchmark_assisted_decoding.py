@@ -0,0 +1,78 @@
+import argparse
+import logging
+import time
+
+from cbt_assistant.configuration.templates import Device, ModelConfig
+from cbt_assistant.llm.models import AvailableHuggingFaceModels, HuggingFaceModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ForwardCounter:
+    def __init__(self, model):
+        self.calls = 0
+        model.register_forward_hook(self._hook)
+
+    def _hook(self, module, inputs, outputs):
+        self.calls += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure assisted decoding against greedy decoding")
+    parser.add_argument("--device", type=str, default=Device.CPU.value, help="cpu or cuda")
+    parser.add_argument("--draft-model", type=str, default=AvailableHuggingFaceModels.PHI1_5.value, help="Draft model id")
+    parser.add_argument("--draft-tokens", type=int, default=5, help="Initial tokens drafted per step")
+    parser.add_argument("--prompts", type=str, default="cbt_assistant/data/cbt_topics.txt", help="One topic per line")
+    parser.add_argument("--requests", type=int, default=5, help="Number of prompts")
+    parser.add_argument("--max-tokens", type=int, default=200, help="New tokens per prompt")
+    args = parser.parse_args()
+
+    with open(args.prompts, "r") as f:
+        topics = [line.strip() for line in f if line.strip()][: args.requests]
+
+    model = HuggingFaceModel(
+        ModelConfig(
+            device=args.device,
+            max_tokens=args.max_tokens,
+            draft_model_id=args.draft_model,
+            num_draft_tokens=args.draft_tokens,
+        )
+    )
+    target_passes = ForwardCounter(model.causal_lm)
+    draft_passes = ForwardCounter(model.draft_lm)
+
+    greedy_time = assisted_time = 0.0
+    new_tokens = target_calls = draft_calls = 0
+
+    for topic in topics:
+        inputs = model.tokenizer(f"Explain {topic}.", return_tensors="pt").to(args.device)
+        kwargs = dict(max_new_tokens=args.max_tokens, do_sample=False)
+
+        start = time.perf_counter()
+        greedy = model.causal_lm.generate(**inputs, **kwargs)
+        greedy_time += time.perf_counter() - start
+
+        target_passes.calls = draft_passes.calls = 0
+        start = time.perf_counter()
+        assisted = model.causal_lm.generate(**inputs, **kwargs, assistant_model=model.draft_lm)
+        assisted_time += time.perf_counter() - start
+
+        if not greedy.equal(assisted):
+            raise SystemExit(f"❌ Assisted output differs from greedy decoding for '{topic}'")
+
+        new_tokens += assisted.shape[1] - inputs["input_ids"].shape[1]
+        target_calls += target_passes.calls
+        draft_calls += draft_passes.calls
+
+    # Every target pass verifies the drafted tokens and adds one token of its own.
+    accepted = new_tokens - target_calls
+    logger.info(f"Greedy: {new_tokens / greedy_time:.2f} tok/s, assisted: {new_tokens / assisted_time:.2f} tok/s")
+    logger.info(f"Speedup: {greedy_time / assisted_time:.2f}x")
+    logger.info(f"Acceptance rate: {accepted / max(draft_calls, 1):.1%} ({accepted}/{draft_calls} drafted tokens)")
+    logger.info(f"Tokens per target forward pass: {new_tokens / max(target_calls, 1):.2f}")
+    logger.info("✅ Assisted outputs identical to greedy decoding")
+
+
+if __name__ == "__main__":
+    main()
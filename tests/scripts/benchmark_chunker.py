@@ -0,0 +1,73 @@
+import argparse
+import logging
+import time
+from typing import List
+
+import fitz
+
+from cbt_assistant.ingestion.chunker import ChunkBoundary, TokenChunker
+from cbt_assistant.ingestion.tokenizer import TokenizerWrapper
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def legacy_chunks(tokenizer: TokenizerWrapper, text: str, chunk_size: int, overlap: int) -> List[int]:
+    """
+    Previous PDFParser chunking: decode each window, re-encode it for the
+    length check and once more for the chunk metadata.
+    """
+    tokens = tokenizer.encode(text)
+    counts = []
+
+    start = 0
+    while start < len(tokens):
+        chunk_text = tokenizer.decode(tokens[start : start + chunk_size]).strip()
+
+        if tokenizer.count_tokens(chunk_text) > 10:
+            counts.append(tokenizer.count_tokens(chunk_text))
+
+        start += chunk_size - overlap
+
+    return counts
+
+
+def load_pages(path: str) -> List[str]:
+    with fitz.open(path) as doc:
+        return [text for text in (page.get_text().strip() for page in doc) if text]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy and offset-based chunking")
+    parser.add_argument("--pdf", type=str, required=True, help="PDF to chunk")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Tokens per chunk")
+    parser.add_argument("--overlap", type=int, default=40, help="Overlapping tokens")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pdf)
+    tokenizer = TokenizerWrapper()
+    logger.info(f"Loaded {len(pages)} pages from {args.pdf}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        legacy = [c for page in pages for c in legacy_chunks(tokenizer, page, args.chunk_size, args.overlap)]
+    legacy_time = (time.perf_counter() - start) / args.repeat
+    print(f"{'legacy':<12}{len(legacy):>8} chunks {legacy_time * 1000:>10.1f} ms")
+
+    for boundary in ChunkBoundary:
+        chunker = TokenChunker(tokenizer, args.chunk_size, args.overlap, boundary=boundary)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            chunks = list(chunker.chunk_pages(enumerate(pages, start=1)))
+        elapsed = (time.perf_counter() - start) / args.repeat
+
+        print(
+            f"{boundary.value:<12}{len(chunks):>8} chunks {elapsed * 1000:>10.1f} ms"
+            f"   {legacy_time / elapsed:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
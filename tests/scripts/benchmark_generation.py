@@ -0,0 +1,55 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cbt_assistant.configuration.templates import Device, ModelConfig
+from cbt_assistant.llm.models import HuggingFaceModel
+from cbt_assistant.llm.scheduler import ContinuousBatchingScheduler
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run_concurrent(model, prompts, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        responses = list(pool.map(model.generate, prompts))
+    return responses, time.perf_counter() - start
+
+
+def count_tokens(tokenizer, responses):
+    return sum(len(tokenizer(r).input_ids) for r in responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request generation with continuous batching")
+    parser.add_argument("--device", type=str, default=Device.CPU.value, help="cpu or cuda")
+    parser.add_argument("--prompts", type=str, default="cbt_assistant/data/cbt_topics.txt", help="One prompt per line")
+    parser.add_argument("--requests", type=int, default=16, help="Number of prompts to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--max-batch-size", type=int, default=8, help="Scheduler batch slots")
+    parser.add_argument("--max-tokens", type=int, default=64, help="New tokens per request")
+    args = parser.parse_args()
+
+    with open(args.prompts, "r") as f:
+        topics = [line.strip() for line in f if line.strip()]
+    prompts = [f"Explain {topics[i % len(topics)]}." for i in range(args.requests)]
+
+    model = HuggingFaceModel(ModelConfig(device=args.device, max_tokens=args.max_tokens))
+    tokenizer = model.tokenizer
+
+    responses, elapsed = run_concurrent(model, prompts, args.concurrency)
+    tokens = count_tokens(tokenizer, responses)
+    logger.info(f"Per-request: {tokens} tokens in {elapsed:.1f}s, {tokens / elapsed:.1f} tok/s")
+
+    scheduler = ContinuousBatchingScheduler(model, max_batch_size=args.max_batch_size)
+    responses, elapsed = run_concurrent(scheduler, prompts, args.concurrency)
+    tokens = count_tokens(tokenizer, responses)
+    logger.info(f"Continuous batching: {tokens} tokens in {elapsed:.1f}s, {tokens / elapsed:.1f} tok/s")
+    logger.info(f"Scheduler stats: {scheduler.stats().model_dump()}")
+    scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import logging
+import time
+
+import faiss
+import numpy as np
+
+from cbt_assistant.configuration.templates import (
+    IndexConfig,
+    IndexMetric,
+    IndexType,
+    VectorEncoding,
+)
+from cbt_assistant.rag.faiss_index import FAISSIndexFactory, reconstruct_with_ids
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+CANDIDATES = [
+    IndexConfig(index_type=IndexType.FLAT),
+    *[IndexConfig(index_type=IndexType.IVF_FLAT, nprobe=p) for p in (4, 16, 64)],
+    *[IndexConfig(index_type=IndexType.HNSW, ef_search=ef) for ef in (32, 64, 128)],
+    *[IndexConfig(index_type=IndexType.IVF_PQ, nprobe=p) for p in (16, 64)],
+    *[
+        IndexConfig(metric=IndexMetric.INNER_PRODUCT, encoding=e)
+        for e in (VectorEncoding.FP16, VectorEncoding.SQ8, VectorEncoding.SQ4)
+    ],
+]
+
+
+def load_vectors(args) -> np.ndarray:
+    if args.index:
+        logger.info(f"Reading vectors from {args.index}")
+        _, vectors = reconstruct_with_ids(faiss.read_index(args.index))
+        return vectors.astype("float32")
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.num_vectors, args.dim)).astype("float32")
+    faiss.normalize_L2(vectors)
+
+    return vectors
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report recall@k vs. latency per index type")
+    parser.add_argument("--index", type=str, help="Existing .faiss index to take vectors from")
+    parser.add_argument("--num-vectors", type=int, default=200_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per query")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype("float32")
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+
+    print(f"{'index':<24}{'build s':>10}{'p50 ms':>10}{'p95 ms':>10}{f'recall@{args.k}':>12}")
+
+    for config in CANDIDATES:
+        factory = FAISSIndexFactory(config)
+
+        start = time.perf_counter()
+        index = factory.create(vectors.shape[1], vectors)
+        index.add_with_ids(vectors, np.arange(len(vectors)))
+        build = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            _, ids = index.search(query[None, :], args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(ids[0])
+
+        label = config.index_type.value
+        if config.encoding != VectorEncoding.FLOAT32:
+            label += f" {config.metric.value}/{config.encoding.value}"
+        if config.index_type in (IndexType.IVF_FLAT, IndexType.IVF_PQ):
+            label += f" nprobe={config.nprobe}"
+        elif config.index_type == IndexType.HNSW:
+            label += f" ef={config.ef_search}"
+
+        print(
+            f"{label:<24}{build:>10.2f}{np.percentile(latencies, 50):>10.3f}"
+            f"{np.percentile(latencies, 95):>10.3f}{recall_at_k(np.array(found), truth):>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import logging
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from cbt_assistant.configuration.templates import Device, LoadMode, ModelConfig
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def measure(config: ModelConfig, prompt: str) -> dict:
+    # Imported here so each mode is measured in a fresh process.
+    from cbt_assistant.llm.models import HuggingFaceModel
+
+    start = time.perf_counter()
+    model = HuggingFaceModel(config)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = model.generate(prompt)
+    generate_time = time.perf_counter() - start
+    tokens = len(model.tokenizer(response).input_ids)
+
+    return dict(
+        load_time=load_time,
+        peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        tokens_per_second=tokens / generate_time,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model load modes")
+    parser.add_argument("--device", type=str, default=Device.CPU.value, help="cpu or cuda")
+    parser.add_argument(
+        "--modes",
+        type=str,
+        nargs="+",
+        default=[LoadMode.FP32.value, LoadMode.BF16.value, LoadMode.INT8_DYNAMIC.value],
+        help="Load modes to measure",
+    )
+    parser.add_argument("--threads", type=int, default=None, help="Intra-op threads")
+    parser.add_argument("--max-tokens", type=int, default=64, help="New tokens to generate")
+    parser.add_argument("--prompt", type=str, default="Explain what a thought record is.", help="Prompt")
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        config = ModelConfig(
+            device=args.device,
+            load_mode=mode,
+            num_threads=args.threads,
+            max_tokens=args.max_tokens,
+        )
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(measure, config, args.prompt).result()
+
+        logger.info(
+            f"{mode}: load {result['load_time']:.1f}s, "
+            f"peak RSS {result['peak_rss_mb']:.0f} MB, "
+            f"{result['tokens_per_second']:.2f} tok/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import logging
+import subprocess
+import sys
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STAGES = {
+    "interpreter": "pass",
+    "import config schemas": "import cbt_assistant.configuration.templates",
+    "load config": (
+        "from cbt_assistant.configuration.utils import load_config\n"
+        "load_config({config!r})"
+    ),
+    "construct pipeline": (
+        "from cbt_assistant.configuration.utils import load_config\n"
+        "from cbt_assistant.pipeline import Pipeline\n"
+        "Pipeline(load_config({config!r}))"
+    ),
+    "construct + warmup": (
+        "from cbt_assistant.configuration.utils import load_config\n"
+        "from cbt_assistant.pipeline import Pipeline\n"
+        "Pipeline(load_config({config!r})).warmup()"
+    ),
+}
+
+
+def run_stage(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of each startup stage")
+    parser.add_argument("--config", type=str, default="app_config.yaml", help="Path to the configuration file")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--skip-warmup", action="store_true", help="Do not load models")
+    args = parser.parse_args()
+
+    for name, code in STAGES.items():
+        if args.skip_warmup and name == "construct + warmup":
+            continue
+
+        code = code.format(config=args.config)
+        elapsed = min(run_stage(code) for _ in range(args.repeats))
+        logger.info(f"{name}: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
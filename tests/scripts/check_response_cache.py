@@ -0,0 +1,51 @@
+import argparse
+import logging
+import sys
+import time
+from cbt_assistant.configuration.templates import ResponseCacheConfig
+from cbt_assistant.configuration.utils import load_config
+from cbt_assistant.pipeline import Pipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that repeated queries are answered from the response cache")
+    parser.add_argument("--config", type=str, default="app_config.yaml", help="Path to the configuration file")
+    parser.add_argument("--query", type=str, default="How do thought records work?", help="Query to repeat")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of times the query is asked")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if config.response_cache is None:
+        config.response_cache = ResponseCacheConfig()
+
+    pipeline = Pipeline(config)
+    llm = pipeline._llm
+    calls = 0
+    generate = llm.generate
+
+    def counting_generate(prompt: str) -> str:
+        nonlocal calls
+        calls += 1
+        return generate(prompt)
+
+    # Shadows the bound method for both the plain and the RAG pipeline.
+    llm.generate = counting_generate
+
+    for i in range(args.repeats):
+        start = time.perf_counter()
+        pipeline.generate(args.query)
+        logger.info(f"Query {i + 1}: {time.perf_counter() - start:.3f}s")
+
+    cached = len(pipeline._response_cache)
+    logger.info(f"Model calls: {calls}, cached responses: {cached}")
+
+    if calls != 1 or cached != 1:
+        logger.error("Repeated queries were not answered from the response cache")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from cbt_assistant.rag.embedder import SentenceTransformersEmbedder
+from cbt_assistant.rag.onnx_embedder import ONNXEmbedder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def timed_embed(embedder, texts, batch_size):
+    start = time.perf_counter()
+    vectors = np.vstack(
+        [embedder.embed(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)]
+    )
+    return vectors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check ONNX embedder speed and compatibility")
+    parser.add_argument("--model", type=str, default="intfloat/e5-small-v2", help="Embedding model")
+    parser.add_argument("--onnx-dir", type=str, required=True, help="Directory for the exported model")
+    parser.add_argument("--no-quantize", action="store_true", help="Use the fp32 ONNX model")
+    parser.add_argument("--texts", type=str, default="cbt_assistant/data/cbt_topics.txt", help="One text per line")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per embed call")
+    parser.add_argument("--tolerance", type=float, default=0.99, help="Minimum cosine similarity")
+    args = parser.parse_args()
+
+    with open(args.texts, "r") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    reference = SentenceTransformersEmbedder(args.model)
+    onnx = ONNXEmbedder(args.model, model_dir=args.onnx_dir, quantized=not args.no_quantize)
+
+    ref_vectors, ref_time = timed_embed(reference, texts, args.batch_size)
+    onnx_vectors, onnx_time = timed_embed(onnx, texts, args.batch_size)
+
+    cosines = (ref_vectors * onnx_vectors).sum(axis=1)
+    logger.info(f"PyTorch: {len(texts) / ref_time:.1f} texts/s, ONNX: {len(texts) / onnx_time:.1f} texts/s")
+    logger.info(f"Cosine to PyTorch vectors: min {cosines.min():.4f}, mean {cosines.mean():.4f}")
+
+    if cosines.min() < args.tolerance:
+        raise SystemExit(f"❌ ONNX vectors below cosine tolerance {args.tolerance}")
+
+    logger.info(f"✅ ONNX vectors within cosine tolerance {args.tolerance}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import logging
+import os
+
+from cbt_assistant.configuration.templates import (
+    IndexConfig,
+    IndexMetric,
+    IndexType,
+    VectorEncoding,
+)
+from cbt_assistant.rag.faiss_index import convert_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a FAISS index file in place")
+    parser.add_argument("--index", type=str, required=True, help="Path to the .faiss file")
+    parser.add_argument("--index-type", type=IndexType, default=IndexType.FLAT)
+    parser.add_argument("--metric", type=IndexMetric, default=IndexMetric.INNER_PRODUCT)
+    parser.add_argument("--encoding", type=VectorEncoding, default=VectorEncoding.SQ8)
+    args = parser.parse_args()
+
+    config = IndexConfig(index_type=args.index_type, metric=args.metric, encoding=args.encoding)
+
+    size_before = os.path.getsize(args.index)
+    convert_index(args.index, config)
+    size_after = os.path.getsize(args.index)
+
+    logger.info(f"✅ Converted {args.index}: {size_before / 2**20:.1f} MiB -> {size_after / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
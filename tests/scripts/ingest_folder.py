@@ -1,11 +1,8 @@
 import argparse
 import logging
-import os
 
-from tqdm import tqdm
-
-from cbt_assistant.configuration.templates import RAGConfig
-from cbt_assistant.ingestion.utils import add_file_to_store
+from cbt_assistant.configuration.utils import load_config
+from cbt_assistant.ingestion.utils import ingest_folder
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,26 +11,25 @@ logger = logging.getLogger(__name__)
 def main():
     parser = argparse.ArgumentParser(description="Ingest all supported files from folder into RAG store")
     parser.add_argument("--folder", type=str, required=True, help="Path to folder with documents")
+    parser.add_argument("--config", type=str, default="app_config.yaml", help="Path to the configuration file")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks per embedding batch")
+    parser.add_argument("--checkpoint-every", type=int, default=50, help="Files between index checkpoints")
     args = parser.parse_args()
 
-    folder_path = args.folder
-
-    config = RAGConfig()
-
-    pdf_files = [
-        os.path.join(root, file)
-        for root, _, files in os.walk(folder_path)
-        for file in files
-    ]
+    config = load_config(args.config).rag
 
-    logger.info(f"📂 Found {len(pdf_files)} PDF files in {folder_path}")
+    if config is None:
+        raise SystemExit(f"❌ No rag section in {args.config}")
 
-    for file_path in tqdm(pdf_files, desc="Ingesting files"):
-        try:
-            add_file_to_store(file_path, config=config)
-        except Exception as e:
-            logger.warning(f"❌ Failed to ingest {file_path}: {e}")
+    ingest_folder(
+        args.folder,
+        config,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_every=args.checkpoint_every,
+    )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()